@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenizer micro-benchmark - tokens/sec of the previous re.sub/split tokenizer
+versus core.Tokenizer, over every document in the domain and stack CSVs.
+
+Usage: python bench_tokenizer.py [--repeat 20]
+"""
+
+import argparse
+import re
+import time
+
+from core import CSV_CONFIG, STACK_CONFIG, DATA_DIR, _STACK_COLS, _load_csv, Tokenizer
+
+
+def legacy_tokenize(text):
+    """Tokenizer as it was before core.Tokenizer (pattern looked up per call)"""
+    text = re.sub(r'[^\w\s]', ' ', str(text).lower())
+    return [w for w in text.split() if len(w) > 2]
+
+
+def load_documents():
+    """Index documents (joined search columns) of every domain and stack CSV"""
+    sources = [(c["file"], c["search_cols"]) for c in CSV_CONFIG.values()]
+    sources += [(c["file"], _STACK_COLS["search_cols"]) for c in STACK_CONFIG.values()]
+    documents = []
+    for rel_file, search_cols in sources:
+        filepath = DATA_DIR / rel_file
+        if filepath.exists():
+            documents += [" ".join(str(row.get(col, "")) for col in search_cols) for row in _load_csv(filepath)]
+    return documents
+
+
+def bench(tokenize, texts, repeat):
+    """Best-of-`repeat` tokens/sec for one tokenize function"""
+    best = float("inf")
+    n_tokens = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n_tokens = sum(len(tokenize(text)) for text in texts)
+        best = min(best, time.perf_counter() - start)
+    return n_tokens / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tokenizer micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed passes per tokenizer (best is reported)")
+    args = parser.parse_args()
+
+    documents = load_documents()
+    queries = [" ".join(doc.split()[:4]) for doc in documents] * 5
+    tokenizer = Tokenizer()
+
+    rows = [
+        ("documents: legacy re.sub", bench(legacy_tokenize, documents, args.repeat)),
+        ("documents: Tokenizer.tokenize", bench(tokenizer.tokenize, documents, args.repeat)),
+        ("queries:   legacy re.sub", bench(legacy_tokenize, queries, args.repeat)),
+        ("queries:   Tokenizer.tokenize_query", bench(tokenizer.tokenize_query, queries, args.repeat)),
+    ]
+    print(f"{len(documents)} documents, {len(queries)} queries")
+    for name, rate in rows:
+        print(f"{name:<42} {rate / 1e6:8.2f} M tokens/sec")
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search benchmark - latency, throughput, memory and index build time for
+core.search (every CSV_CONFIG domain), core.search_stack (every STACK_CONFIG
+stack) and generate_design_system (ascii and markdown).
+
+Usage: python benchmark.py [--rounds 20] [--output results.json] [--compare base.json]
+       python benchmark.py --precompiled     (serve cold indexes from search-index.bin)
+       python benchmark.py --backend numpy
+
+Cold runs drop every in-process cache before each call, so they include CSV
+loading and index fitting; warm runs repeat the same call on hot caches.
+design_system times generation with the result cache off (warm runs would
+otherwise be cache hits); design_system_cached times the cache hits.
+Results are written as sorted JSON so two runs can be diffed, or compared
+with --compare.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import core
+import design_system
+import result_cache
+from core import CSV_CONFIG, STACK_CONFIG, DATA_DIR, _STACK_COLS, search, search_stack
+from design_system import generate_design_system
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# ============ QUERY CORPUS ============
+# Fixed so results stay comparable between commits
+QUERIES = [
+    "saas dashboard",
+    "dark mode glassmorphism",
+    "fintech banking app trust",
+    "minimal clean landing page",
+    "ecommerce product grid conversion",
+    "healthcare accessibility contrast",
+    "playful gaming colorful animation",
+    "data visualization trend comparison",
+    "elegant serif typography luxury",
+    "mobile navigation touch targets",
+]
+
+STACK_QUERIES = [
+    "responsive layout",
+    "form validation",
+    "performance rendering",
+    "accessibility focus",
+    "state management",
+]
+
+DESIGN_SYSTEM_QUERIES = [
+    "saas analytics dashboard",
+    "wellness spa booking",
+    "crypto trading platform",
+    "children education app",
+]
+
+
+# ============ MEASUREMENT ============
+def reset_caches():
+    """Drop every in-process cache so the next call runs cold"""
+    core.clear_cache()
+    core._detect_domain_cached.cache_clear()
+    core.DEFAULT_TOKENIZER._cached_query.cache_clear()
+    design_system._reasoning_rules = None
+    result_cache.get_cache().clear()
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(seconds):
+    """Latency statistics in milliseconds"""
+    values = sorted(s * 1000 for s in seconds)
+    return {
+        "n": len(values),
+        "mean_ms": round(sum(values) / len(values), 4),
+        "p50_ms": round(percentile(values, 50), 4),
+        "p90_ms": round(percentile(values, 90), 4),
+        "p99_ms": round(percentile(values, 99), 4),
+        "max_ms": round(values[-1], 4),
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def bench_calls(calls, rounds):
+    """Cold and warm latency plus warm throughput for a list of (fn, args)"""
+    cold = []
+    for fn, args in calls:
+        reset_caches()
+        cold.append(timed(fn, *args))
+
+    for fn, args in calls:
+        fn(*args)
+    warm = [timed(fn, *args) for _ in range(rounds) for fn, args in calls]
+    return {
+        "cold": summarize(cold),
+        "warm": summarize(warm),
+        "throughput_qps": round(len(warm) / sum(warm), 2),
+    }
+
+
+# ============ BENCHMARKS ============
+def bench_build():
+    """Time to load and index each CSV from scratch, in milliseconds"""
+    sources = [(c["file"], c["search_cols"], c.get("field_weights")) for c in CSV_CONFIG.values()]
+    sources += [(c["file"], _STACK_COLS["search_cols"], None) for c in STACK_CONFIG.values()]
+    build = {}
+    for rel_file, search_cols, field_weights in sources:
+        filepath = DATA_DIR / rel_file
+        if not filepath.exists():
+            continue
+        signature = core._file_signature(filepath)
+        build[rel_file] = round(timed(core._build_index, filepath, search_cols, signature, field_weights) * 1000, 4)
+    build["total_ms"] = round(sum(build.values()), 4)
+    return build
+
+
+def run(rounds):
+    results = {"peak_rss_kb": {}}
+
+    results["build_ms"] = bench_build()
+    results["peak_rss_kb"]["build"] = peak_rss_kb()
+
+    results["search"] = {
+        domain: bench_calls([(search, (query, domain)) for query in QUERIES], rounds)
+        for domain in CSV_CONFIG
+    }
+    results["search"]["auto"] = bench_calls([(search, (query,)) for query in QUERIES], rounds)
+    results["peak_rss_kb"]["search"] = peak_rss_kb()
+
+    results["search_stack"] = {
+        stack: bench_calls([(search_stack, (query, stack)) for query in STACK_QUERIES], rounds)
+        for stack in STACK_CONFIG
+    }
+    results["peak_rss_kb"]["search_stack"] = peak_rss_kb()
+
+    def bench_design_system():
+        return {
+            fmt: bench_calls([(generate_design_system, (query, None, fmt)) for query in DESIGN_SYSTEM_QUERIES],
+                             max(1, rounds // 4))
+            for fmt in ("ascii", "markdown")
+        }
+
+    # A zero-entry result cache never hits, so every run generates
+    cache = result_cache.get_cache()
+    result_cache.configure(max_entries=0)
+    try:
+        results["design_system"] = bench_design_system()
+    finally:
+        result_cache._cache = cache
+    results["design_system_cached"] = bench_design_system()
+    results["peak_rss_kb"]["design_system"] = peak_rss_kb()
+    return results
+
+
+# ============ REPORTING ============
+def flatten(results, prefix=""):
+    """{"search/style/warm/p50_ms": value, ...} for every numeric leaf"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def print_summary(results):
+    print(f"{'':<28} {'cold p50':>10} {'cold p99':>10} {'warm p50':>10} {'warm p99':>10} {'qps':>10}")
+    for section, label in (("search", "search"), ("search_stack", "stack"), ("design_system", "design"),
+                           ("design_system_cached", "design+cache")):
+        for name, stats in results[section].items():
+            cold, warm = stats["cold"], stats["warm"]
+            print(f"{label + ':' + name:<28} {cold['p50_ms']:>8.3f}ms {cold['p99_ms']:>8.3f}ms "
+                  f"{warm['p50_ms']:>8.3f}ms {warm['p99_ms']:>8.3f}ms {stats['throughput_qps']:>10.1f}")
+    print(f"\nIndex build: {results['build_ms']['total_ms']:.2f}ms for {len(results['build_ms']) - 1} CSVs")
+    print(f"Peak RSS: {results['peak_rss_kb']['design_system']} KiB")
+
+
+def print_comparison(base, new):
+    """Relative change of latency (_ms) and throughput (_qps) metrics"""
+    base_flat, new_flat = flatten(base["results"]), flatten(new["results"])
+    print(f"{'metric':<48} {'base':>12} {'new':>12} {'change':>8}")
+    for path in sorted(new_flat):
+        if path not in base_flat or not path.endswith(("p50_ms", "p99_ms", "_qps", "total_ms")):
+            continue
+        old, cur = base_flat[path], new_flat[path]
+        change = f"{(cur - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{path:<48} {old:>12.3f} {cur:>12.3f} {change:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max search benchmark")
+    parser.add_argument("--rounds", type=int, default=20, help="Warm repetitions of each query (design system: rounds/4)")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASE", help="Compare against a previous --output file")
+    parser.add_argument("--precompiled", action="store_true", help="Serve cold indexes from the precompiled index file")
+    parser.add_argument("--backend", choices=core.BM25.BACKENDS, default=core.BM25_BACKEND, help="BM25 scoring backend")
+    args = parser.parse_args()
+
+    core.BM25_BACKEND = args.backend
+    if args.precompiled and not core.enable_precompiled():
+        parser.error("no precompiled index; run: python search.py --build-index")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "precompiled": args.precompiled,
+            "rounds": args.rounds,
+        },
+        "results": run(args.rounds),
+    }
+
+    print_summary(report["results"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print()
+            print_comparison(json.load(f), report)
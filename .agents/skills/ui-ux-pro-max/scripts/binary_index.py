@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precompiled Index - serializes every CSV_CONFIG/STACK_CONFIG BM25 index into
+one memory-mappable file so a fresh CLI process can skip CSV parsing and fitting.
+
+Usage:
+    python search.py --build-index          # writes data/search-index.bin
+
+File layout (all arrays native byte order, 8-byte aligned):
+    MAGIC | header length (uint32 LE) | JSON header | arrays...
+
+The JSON header lists one section per CSV with its file signature
+(mtime_ns, size), field weights, N, k1, b, field names and the offset/length
+of each array:
+    vocab_offsets, vocab_blob   sorted UTF-8 vocabulary
+    post_offsets                start of each term's postings (len = vocab + 1)
+    post_docs, post_tfs         postings: doc id and term frequency (BM25F: tf~,
+                                with b stored as 0 like BM25F's document level)
+    doc_lengths, idf            per-document length, per-term idf
+    row_offsets, row_blob       rows as JSON lists aligned with the field names,
+                                plus a trailing list of overflow cells for
+                                rows longer than the header
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from core import BM25, CsvIndex, DATA_DIR, build_indexes, get_index, _file_signature, _index_sources, _weights_key
+
+
+# ============ CONFIGURATION ============
+INDEX_FILE = DATA_DIR / "search-index.bin"
+MAGIC = b"UXPMIDX1"
+FORMAT_VERSION = 3
+ALIGN = 8
+
+# array typecode per section array
+_TYPECODES = {
+    "vocab_offsets": "I",
+    "vocab_blob": "B",
+    "post_offsets": "I",
+    "post_docs": "I",
+    "post_tfs": "d",
+    "doc_lengths": "I",
+    "idf": "d",
+    "row_offsets": "I",
+    "row_blob": "B",
+}
+
+
+# ============ BUILD ============
+def _fieldnames(rows):
+    """Column names in CSV order (DictReader's overflow key None is stored separately)"""
+    names = {}
+    for row in rows:
+        for key in row:
+            if key is not None:
+                names[key] = None
+    return list(names)
+
+
+def _section_arrays(index):
+    """Flatten a fitted CsvIndex into typed arrays"""
+    bm25 = index.bm25
+    if not bm25.mutable:
+        # A mapped index has no postings dict; it would serialize no terms
+        raise TypeError("cannot serialize a memory-mapped index; build from a fitted BM25")
+    if bm25._dirty:
+        bm25._refresh()
+    vocab = sorted(bm25.postings, key=lambda t: t.encode("utf-8"))
+
+    arrays = {code: array(_TYPECODES[code]) for code in _TYPECODES}
+    vocab_blob = bytearray()
+    for term in vocab:
+        arrays["vocab_offsets"].append(len(vocab_blob))
+        vocab_blob += term.encode("utf-8")
+        arrays["post_offsets"].append(len(arrays["post_docs"]))
+        idf, plist = bm25._postings(term)
+        for idx, tf in plist:
+            arrays["post_docs"].append(idx)
+            arrays["post_tfs"].append(tf)
+        arrays["idf"].append(idf)
+    arrays["vocab_offsets"].append(len(vocab_blob))
+    arrays["post_offsets"].append(len(arrays["post_docs"]))
+    arrays["vocab_blob"].frombytes(bytes(vocab_blob))
+    arrays["doc_lengths"].extend(bm25.doc_lengths)
+
+    fields = _fieldnames(index.rows)
+    row_blob = bytearray()
+    for row in index.rows:
+        arrays["row_offsets"].append(len(row_blob))
+        values = [row.get(col) for col in fields]
+        if None in row:
+            values.append(row[None])
+        row_blob += json.dumps(values, ensure_ascii=False).encode("utf-8")
+    arrays["row_offsets"].append(len(row_blob))
+    arrays["row_blob"].frombytes(bytes(row_blob))
+    return fields, arrays
+
+
+def build_index_file(path=None, processes=None):
+    """Build indexes for every domain and stack CSV and write them to one file.
+
+    Indexes are built in parallel by core.build_indexes() (``processes``
+    workers), never taken from a precompiled file already in use. Returns
+    its per-file report: (file, N, vocabulary size, seconds, how).
+    """
+    path = path or INDEX_FILE
+    sections, payloads = [], []
+    report = build_indexes(processes, precompiled=False)
+
+    for rel_file, search_cols, field_weights in _index_sources():
+        filepath = DATA_DIR / rel_file
+        if not filepath.exists():
+            continue
+        index = get_index(filepath, search_cols, field_weights)
+        fields, arrays = _section_arrays(index)
+        sections.append({
+            "file": rel_file,
+            "search_cols": list(search_cols),
+            "field_weights": field_weights,
+            "signature": list(index.signature),
+            "N": index.bm25.N,
+            "k1": index.bm25.k1,
+            "b": index.bm25.b,
+            "fields": fields,
+            "arrays": {},
+        })
+        payloads.append(arrays)
+
+    # Offsets depend on the header length, which depends on the offsets;
+    # iterate until the header size is stable.
+    header_bytes = b""
+    while True:
+        data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+        offset = data_start
+        for section, arrays in zip(sections, payloads):
+            for code, arr in arrays.items():
+                nbytes = len(arr) * arr.itemsize
+                section["arrays"][code] = [offset, len(arr)]
+                offset = _align(offset + nbytes)
+        header = {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "sections": sections}
+        new_header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        stable = len(new_header_bytes) == len(header_bytes)
+        header_bytes = new_header_bytes
+        if stable:
+            break
+
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for section, arrays in zip(sections, payloads):
+            for code, arr in arrays.items():
+                f.write(b"\0" * (section["arrays"][code][0] - f.tell()))
+                arr.tofile(f)
+    os.replace(tmp_path, path)
+    return report
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ============ LOAD ============
+class _MappedRows:
+    """Read-only sequence of row dicts decoded on access from the row blob"""
+
+    def __init__(self, fields, offsets, blob):
+        self.fields = fields
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        values = json.loads(bytes(self.blob[start:end]).decode("utf-8"))
+        row = dict(zip(self.fields, values))
+        if len(values) > len(self.fields):
+            # Overflow cells, under DictReader's key None like the in-memory rows
+            row[None] = values[-1]
+        return row
+
+
+class MappedBM25(BM25):
+    """BM25 scorer over memory-mapped arrays (score-only; cannot be refitted)"""
+
+    mutable = False
+
+    def __init__(self, section, views):
+        super().__init__(section["k1"], section["b"])
+        self._views = views
+        self.N = section["N"]
+        self.doc_lengths = views["doc_lengths"]
+        if self.N:
+            self.avgdl = sum(self.doc_lengths) / self.N
+            k1, b, avgdl = self.k1, self.b, self.avgdl
+            self.norms = [k1 * (1 - b + b * dl / avgdl) for dl in self.doc_lengths]
+
+    def fit(self, documents):
+        raise TypeError("MappedBM25 is read-only; fit a BM25 instead")
+
+    def add_documents(self, documents, doc_ids=None):
+        raise TypeError("MappedBM25 is read-only; fit a BM25 instead")
+
+    def remove_documents(self, doc_ids):
+        raise TypeError("MappedBM25 is read-only; fit a BM25 instead")
+
+    def vocab_size(self):
+        return len(self._views["idf"])
+
+    def _term_id(self, token):
+        """Binary search the sorted UTF-8 vocabulary"""
+        offsets, blob = self._views["vocab_offsets"], self._views["vocab_blob"]
+        key = token.encode("utf-8")
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            term = bytes(blob[offsets[mid]:offsets[mid + 1]])
+            if term < key:
+                lo = mid + 1
+            elif term > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _postings(self, token):
+        term_id = self._term_id(token)
+        if term_id is None:
+            return None
+        views = self._views
+        start, end = views["post_offsets"][term_id], views["post_offsets"][term_id + 1]
+        return views["idf"][term_id], list(zip(views["post_docs"][start:end], views["post_tfs"][start:end]))
+
+
+class IndexFile:
+    """A memory-mapped precompiled index file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise
+        self._buf = memoryview(self._mm)
+        if bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Not a search index file: {path}")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(self._buf[start:start + header_len]).decode("utf-8"))
+        if header.get("version") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Incompatible search index file: {path}")
+        self.sections = {
+            (str(DATA_DIR / section["file"]), tuple(section["search_cols"]),
+             _weights_key(section["field_weights"])): section
+            for section in header["sections"]
+        }
+
+    def _views(self, section):
+        views = {}
+        for code, (offset, count) in section["arrays"].items():
+            typecode = _TYPECODES[code]
+            nbytes = count * array(typecode).itemsize
+            view = self._buf[offset:offset + nbytes]
+            views[code] = view if typecode == "B" else view.cast(typecode)
+        return views
+
+    def lookup(self, filepath, search_cols, signature, field_weights=None):
+        """CsvIndex for a CSV if the file holds a fresh section for it, else None"""
+        section = self.sections.get((str(filepath), tuple(search_cols), _weights_key(field_weights)))
+        if section is None or tuple(section["signature"]) != tuple(signature):
+            return None
+        views = self._views(section)
+        rows = _MappedRows(section["fields"], views["row_offsets"], views["row_blob"])
+        return CsvIndex(filepath, search_cols, signature, rows, MappedBM25(section, views), field_weights)
+
+    def stale_files(self):
+        """Relative paths of sections whose CSV changed since the build"""
+        stale = []
+        for section in self.sections.values():
+            filepath = DATA_DIR / section["file"]
+            if not filepath.exists() or tuple(section["signature"]) != _file_signature(filepath):
+                stale.append(section["file"])
+        return stale
+
+
+def load_index_file(path=None):
+    """Open the precompiled index, or return None if it is missing or unusable"""
+    path = path or INDEX_FILE
+    if not os.path.exists(path):
+        return None
+    try:
+        return IndexFile(path)
+    except (OSError, ValueError):
+        return None
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    for rel_file, n_docs, n_terms, seconds, how in build_index_file():
+        print(f"{rel_file}: {n_docs} rows, {n_terms} terms, {seconds * 1000:.1f} ms ({how})")
+    print(f"Wrote {INDEX_FILE}")
@@ -4,215 +4,1092 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
+import copy
 import csv
+import heapq
+import os
 import re
-from pathlib import Path
+import sys
+import threading
+from functools import lru_cache
 from math import log
+from time import perf_counter
 from collections import defaultdict
+from collections.abc import Mapping
+
+import profiling
+# Domain/stack tables live in config.py so the CLI can parse arguments
+# without importing the search engine
+from config import DATA_DIR, MAX_RESULTS, CSV_CONFIG, STACK_CONFIG, _STACK_COLS, AVAILABLE_STACKS
 
 # ============ CONFIGURATION ============
-DATA_DIR = Path(__file__).parent.parent / "data"
-MAX_RESULTS = 3
-
-CSV_CONFIG = {
-    "style": {
-        "file": "styles.csv",
-        "search_cols": ["Style Category", "Keywords", "Best For", "Type"],
-        "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity"]
-    },
-    "prompt": {
-        "file": "prompts.csv",
-        "search_cols": ["Style Category", "AI Prompt Keywords (Copy-Paste Ready)", "CSS/Technical Keywords"],
-        "output_cols": ["Style Category", "AI Prompt Keywords (Copy-Paste Ready)", "CSS/Technical Keywords", "Implementation Checklist"]
-    },
-    "color": {
-        "file": "colors.csv",
-        "search_cols": ["Product Type", "Keywords", "Notes"],
-        "output_cols": ["Product Type", "Keywords", "Primary (Hex)", "Secondary (Hex)", "CTA (Hex)", "Background (Hex)", "Text (Hex)", "Border (Hex)", "Notes"]
-    },
-    "chart": {
-        "file": "charts.csv",
-        "search_cols": ["Data Type", "Keywords", "Best Chart Type", "Accessibility Notes"],
-        "output_cols": ["Data Type", "Keywords", "Best Chart Type", "Secondary Options", "Color Guidance", "Accessibility Notes", "Library Recommendation", "Interactive Level"]
-    },
-    "landing": {
-        "file": "landing.csv",
-        "search_cols": ["Pattern Name", "Keywords", "Conversion Optimization", "Section Order"],
-        "output_cols": ["Pattern Name", "Keywords", "Section Order", "Primary CTA Placement", "Color Strategy", "Conversion Optimization"]
-    },
-    "product": {
-        "file": "products.csv",
-        "search_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Key Considerations"],
-        "output_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Secondary Styles", "Landing Page Pattern", "Dashboard Style (if applicable)", "Color Palette Focus"]
-    },
-    "ux": {
-        "file": "ux-guidelines.csv",
-        "search_cols": ["Category", "Issue", "Description", "Platform"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
-    },
-    "typography": {
-        "file": "typography.csv",
-        "search_cols": ["Font Pairing Name", "Category", "Mood/Style Keywords", "Best For", "Heading Font", "Body Font"],
-        "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"]
-    },
-    "icons": {
-        "file": "icons.csv",
-        "search_cols": ["Category", "Icon Name", "Keywords", "Best For"],
-        "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"]
-    },
-    "react": {
-        "file": "react-performance.csv",
-        "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
-    },
-    "web": {
-        "file": "web-interface.csv",
-        "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
-    }
-}
+BM25_BACKEND = "python"  # "numpy" for vectorized scoring of cached indexes (call clear_cache() after changing)
+# Top-k queries use MaxScore early termination on corpora of at least
+# MAXSCORE_MIN_DOCS documents when they touch MAXSCORE_MIN_POSTINGS postings;
+# below that plain accumulation is faster
+MAXSCORE_MIN_DOCS = 500
+MAXSCORE_MIN_POSTINGS = 256
+MAXSCORE_EPSILON = 1e-9  # relative slack so float rounding never prunes a true top-k document
+# Below this much CSV to index, starting a process pool costs more than it saves
+PARALLEL_BUILD_MIN_BYTES = 2 << 20
 
-STACK_CONFIG = {
-    "html-tailwind": {"file": "stacks/html-tailwind.csv"},
-    "react": {"file": "stacks/react.csv"},
-    "nextjs": {"file": "stacks/nextjs.csv"},
-    "vue": {"file": "stacks/vue.csv"},
-    "nuxtjs": {"file": "stacks/nuxtjs.csv"},
-    "nuxt-ui": {"file": "stacks/nuxt-ui.csv"},
-    "svelte": {"file": "stacks/svelte.csv"},
-    "swiftui": {"file": "stacks/swiftui.csv"},
-    "react-native": {"file": "stacks/react-native.csv"},
-    "flutter": {"file": "stacks/flutter.csv"},
-    "shadcn": {"file": "stacks/shadcn.csv"}
-}
 
-# Common columns for all stacks
-_STACK_COLS = {
-    "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
-    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
+# ============ DOMAIN DETECTION ============
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "prompt": ["prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
 }
+DOMAIN_CACHE_SIZE = 4096
+
+
+class DomainDetector:
+    """Scores domains by how many of their keywords occur in a query.
+
+    All keywords are compiled into one regex. A lookahead finds the longest
+    keyword starting at each position, and every keyword that is a prefix of
+    it is counted as well, so overlapping and nested keywords score exactly
+    like one substring test per keyword. Ties go to the first domain in
+    order; no match falls back to "style".
+    """
+
+    def __init__(self, domain_keywords):
+        self.domains = list(domain_keywords)
+        # keyword -> domain indexes listing it (a keyword listed twice counts twice)
+        owners = defaultdict(list)
+        for d_idx, keywords in enumerate(domain_keywords.values()):
+            for kw in keywords:
+                owners[kw].append(d_idx)
+        self._owners = dict(owners)
+        # keyword -> keywords that are prefixes of it (itself included)
+        self._prefixes = {kw: [k for k in owners if kw.startswith(k)] for kw in owners}
+        alternation = "|".join(re.escape(kw) for kw in sorted(owners, key=len, reverse=True))
+        self._pattern = re.compile(f"(?=({alternation}))") if owners else None
+
+    def scores(self, query_lower):
+        """Keyword hit count per domain, in domain order"""
+        scores = [0] * len(self.domains)
+        if self._pattern is None:
+            return scores
+        matched = set()
+        for m in self._pattern.finditer(query_lower):
+            matched.update(self._prefixes[m.group(1)])
+        for kw in matched:
+            for d_idx in self._owners[kw]:
+                scores[d_idx] += 1
+        return scores
+
+    def detect(self, query):
+        scores = self.scores(query.lower())
+        if not scores:
+            return "style"
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return self.domains[best] if scores[best] > 0 else "style"
+
+
+# Built on first use: compiling the keyword regex is a noticeable part of import time
+_domain_detector = None
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _detect_domain_cached(query):
+    global _domain_detector
+    detector = _domain_detector
+    if detector is None:
+        detector = _domain_detector = DomainDetector(DOMAIN_KEYWORDS)
+    return detector.detect(query)
+
+
+profiling.register_cache("detect_domain", _detect_domain_cached)
+
+
+def register_domain(domain, keywords, config=None):
+    """Add detection keywords for a domain, optionally registering its CSV.
+
+    New domains are checked after the built-in ones, so they win only on
+    a strictly higher keyword count. ``config`` is a CSV_CONFIG entry
+    ({"file", "search_cols", "output_cols"}, optionally "field_weights") for
+    domains not yet searchable.
+    """
+    global _domain_detector
+    keywords = [kw.lower() for kw in keywords]
+    if not all(keywords):
+        raise ValueError("Domain keywords must be non-empty strings")
+    if config is not None:
+        CSV_CONFIG[domain] = config
+    DOMAIN_KEYWORDS.setdefault(domain, [])
+    DOMAIN_KEYWORDS[domain].extend(kw for kw in keywords if kw not in DOMAIN_KEYWORDS[domain])
+    _domain_detector = None
+    _detect_domain_cached.cache_clear()
+
+
+# ============ TOKENIZER ============
+# Runs of 3+ word characters after lowercasing; same tokens as replacing
+# punctuation with spaces, splitting and dropping words of <= 2 chars.
+_TOKEN_RE = re.compile(r'\w{3,}')
+QUERY_CACHE_SIZE = 4096
+
+
+class Tokenizer:
+    """Lowercase, strip punctuation, filter short words.
 
-AVAILABLE_STACKS = list(STACK_CONFIG.keys())
+    Optional stages run after the default pipeline: ``stop_words`` drops
+    listed tokens, then ``stemmer`` (a callable word -> word) rewrites the
+    rest. Without stages tokenize() is a single regex call. Query
+    tokenization is LRU-cached.
+    """
+
+    def __init__(self, stemmer=None, stop_words=None, cache_size=QUERY_CACHE_SIZE):
+        self.stemmer = stemmer
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self._has_stages = stemmer is not None or self.stop_words is not None
+        self._cached_query = lru_cache(maxsize=cache_size)(self._tokenize_tuple)
+
+    def tokenize(self, text):
+        """Tokenize text into a list of terms"""
+        tokens = _TOKEN_RE.findall(str(text).lower())
+        if self._has_stages:
+            tokens = self._apply_stages(tokens)
+        return tokens
+
+    def _apply_stages(self, tokens):
+        if self.stop_words is not None:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        if self.stemmer is not None:
+            stem = self.stemmer
+            tokens = [stem(t) for t in tokens]
+        return tokens
+
+    def _tokenize_tuple(self, text):
+        return tuple(self.tokenize(text))
+
+    def tokenize_query(self, text):
+        """Tokenize a query, cached; returns a tuple"""
+        return self._cached_query(text if isinstance(text, str) else str(text))
+
+    def __reduce__(self):
+        # The query cache wraps a bound method and is rebuilt empty
+        cache_size = self._cached_query.cache_parameters()["maxsize"]
+        return Tokenizer, (self.stemmer, self.stop_words, cache_size)
+
+
+DEFAULT_TOKENIZER = Tokenizer()
+profiling.register_cache("tokenize_query", DEFAULT_TOKENIZER._cached_query)
 
 
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted index)
 
-    def __init__(self, k1=1.5, b=0.75):
+    ``backend="numpy"`` scores with array operations over a term-major
+    sparse matrix; it falls back to pure Python when NumPy is missing.
+    Both backends return identical rankings.
+    """
+
+    BACKENDS = ("python", "numpy")
+
+    def __init__(self, k1=1.5, b=0.75, backend="python", tokenizer=None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown BM25 backend: {backend}. Available: {', '.join(self.BACKENDS)}")
+        self._np = None
+        if backend == "numpy":
+            try:
+                import numpy
+                self._np = numpy
+            except ImportError:
+                backend = "python"
+        self.backend = backend
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
         self.k1 = k1
         self.b = b
-        self.corpus = []
+        self.postings = {}
+        self.doc_terms = []
         self.doc_lengths = []
+        self.norms = []
         self.avgdl = 0
         self.idf = {}
+        self._bounds = {}
         self.doc_freqs = defaultdict(int)
         self.N = 0
+        self._dirty = False
+
+    # Read-only subclasses (e.g. memory-mapped indexes) set this to False
+    mutable = True
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return self.tokenizer.tokenize(text)
 
+    def vocab_size(self):
+        """Number of distinct indexed terms"""
+        return len(self.postings)
+
+    @profiling.span("BM25.fit")
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
-            return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        """Build inverted index (term -> [(doc_id, tf), ...]) from documents"""
+        self.postings = {}
+        self.doc_terms = []
+        self.doc_lengths = []
+        self.doc_freqs = defaultdict(int)
+        self.N = 0
+        self.add_documents(documents)
+        self._refresh()
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+    def add_documents(self, documents, doc_ids=None):
+        """Index more documents; returns their doc ids.
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        New documents are appended unless ``doc_ids`` names free slots to
+        fill (e.g. ids previously passed to remove_documents()). Corpus-wide
+        statistics (avgdl, norms) are recomputed lazily on the next query
+        and idf per term as it is queried.
+        """
+        analyze = self._analyze
+        # Vocabulary strings are interned so indexes share one copy of each term
+        intern = sys.intern
+        postings, doc_freqs = self.postings, self.doc_freqs
+        ids = []
+        for pos, doc in enumerate(documents):
+            if doc_ids is None:
+                idx = len(self.doc_lengths)
+            else:
+                idx = doc_ids[pos]
+                if idx < len(self.doc_terms) and self.doc_terms[idx] is not None:
+                    raise ValueError(f"Document id {idx} is already in use")
+            while len(self.doc_lengths) <= idx:
+                self.doc_lengths.append(0)
+                self.doc_terms.append(None)
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+            term_freqs, length = analyze(idx, doc)
+            for word, tf in term_freqs.items():
+                plist = postings.get(word)
+                if plist is None:
+                    plist = postings[intern(word)] = []
+                plist.append((idx, tf))
+                doc_freqs[word] += 1
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+            self.doc_terms[idx] = tuple(term_freqs)
+            self.doc_lengths[idx] = length
+            self.N += 1
+            ids.append(idx)
 
+        self._invalidate()
+        return ids
+
+    def _analyze(self, idx, doc):
+        """(term -> tf, length) of the document being indexed as ``idx``"""
+        tokens = self.tokenizer.tokenize(doc)
+        term_freqs = defaultdict(int)
+        for word in tokens:
+            term_freqs[word] += 1
+        return term_freqs, len(tokens)
+
+    def remove_documents(self, doc_ids):
+        """Remove documents from the index; their ids become free slots"""
+        postings, doc_freqs = self.postings, self.doc_freqs
+        for idx in doc_ids:
+            if idx >= len(self.doc_terms) or self.doc_terms[idx] is None:
+                continue
+            for word in self.doc_terms[idx]:
+                plist = postings[word]
+                for pos, (doc, _) in enumerate(plist):
+                    if doc == idx:
+                        del plist[pos]
+                        break
+                if plist:
+                    doc_freqs[word] -= 1
+                else:
+                    del postings[word]
+                    del doc_freqs[word]
+            self.doc_terms[idx] = None
+            self.doc_lengths[idx] = 0
+            self.N -= 1
+
+        # Free slots at the end are dropped so appended ids stay dense
+        while self.doc_terms and self.doc_terms[-1] is None:
+            self.doc_terms.pop()
+            self.doc_lengths.pop()
+        self._invalidate()
+
+    def _invalidate(self):
+        # idf depends on N, so cached values are dropped right away
+        self.idf = {}
+        self._bounds = {}
+        self._dirty = True
+
+    def _refresh(self):
+        """Recompute avgdl and length norms after documents were added or removed"""
+        if self.N:
+            self.avgdl = sum(self.doc_lengths) / self.N
+            # Length normalisation only depends on the document, so pay for it once
+            k1, b, avgdl = self.k1, self.b, self.avgdl
+            self.norms = [k1 * (1 - b + b * dl / avgdl) for dl in self.doc_lengths]
+            if self.backend == "numpy":
+                self._fit_numpy()
+        else:
+            self.avgdl = 0
+            self.norms = []
+        self._dirty = False
+
+    def __getstate__(self):
+        """Picklable state (indexes built in worker processes are sent back whole)"""
+        state = dict(self.__dict__)
+        state["_np"] = None
+        if self.tokenizer is DEFAULT_TOKENIZER:
+            state["tokenizer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.tokenizer is None:
+            self.tokenizer = DEFAULT_TOKENIZER
+        if self.backend == "numpy":
+            import numpy
+            self._np = numpy
+        # Share one copy of each term with the indexes built in this process
+        intern = sys.intern
+        self.postings = {intern(word): plist for word, plist in self.postings.items()}
+        self.doc_terms = [None if terms is None else tuple(map(intern, terms)) for terms in self.doc_terms]
+
+    def _idf(self, word):
+        """idf of a vocabulary term, computed on first use"""
+        idf = self.idf.get(word)
+        if idf is None:
+            freq = self.doc_freqs[word]
+            idf = self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        return idf
+
+    def copy(self):
+        """Independent copy that can be updated while this one keeps serving queries"""
+        clone = copy.copy(self)
+        clone.postings = {word: list(plist) for word, plist in self.postings.items()}
+        clone.doc_terms = list(self.doc_terms)
+        clone.doc_lengths = list(self.doc_lengths)
+        clone.norms = list(self.norms)
+        clone.idf = dict(self.idf)
+        clone._bounds = dict(self._bounds)
+        clone.doc_freqs = defaultdict(int, self.doc_freqs)
+        return clone
+
+    def _fit_numpy(self):
+        """Pack postings into CSR arrays (one row per term) for the numpy backend"""
+        np = self._np
+        self._np_term_ids = {word: i for i, word in enumerate(self.postings)}
+        entries = [self._postings(word) for word in self.postings]
+        indptr = [0]
+        for _, plist in entries:
+            indptr.append(indptr[-1] + len(plist))
+        self._np_indptr = np.array(indptr, dtype=np.int64)
+        self._np_docs = np.fromiter((idx for _, plist in entries for idx, _ in plist),
+                                    dtype=np.int64, count=indptr[-1])
+        self._np_tfs = np.fromiter((tf for _, plist in entries for _, tf in plist),
+                                   dtype=np.float64, count=indptr[-1])
+        self._np_idf = np.array([idf for idf, _ in entries], dtype=np.float64)
+        # k1 * (1 - b + b * dl / avgdl), one entry per document
+        self._np_norms = np.array(self.norms, dtype=np.float64)
+
+    def _postings(self, token):
+        """(idf, [(doc_id, tf), ...]) for a vocabulary term, or None"""
+        plist = self.postings.get(token)
+        if plist is None:
+            return None
+        return self._idf(token), plist
+
+    def _term_weights(self, token):
+        """Per-document BM25 contribution of one term: [(doc_id, weight), ...]
+
+        Returns None when the term is not in the vocabulary.
+        """
+        entry = self._postings(token)
+        if entry is None:
+            return None
+        idf, plist = entry
+        k1_plus = self.k1 + 1
+        norms = self.norms
+        return [(idx, idf * (tf * k1_plus) / (tf + norms[idx])) for idx, tf in plist]
+
+    def _upper_bound(self, token, idf, plist):
+        """Largest contribution the term makes to any document (cached)"""
+        bound = self._bounds.get(token)
+        if bound is None:
+            k1_plus = self.k1 + 1
+            norms = self.norms
+            bound = self._bounds[token] = idf * max((tf * k1_plus) / (tf + norms[idx]) for idx, tf in plist)
+        return bound
+
+    def _accumulate(self, query_tokens, weights):
+        """Sum term contributions over the postings of the query tokens only.
+
+        ``weights`` caches _term_weights() per term so a batch of queries
+        computes each term's contributions once.
+        """
+        scores = {}
+        for token in query_tokens:
+            if token in weights:
+                plist = weights[token]
+            else:
+                plist = weights[token] = self._term_weights(token)
+            if plist is None:
+                continue
+            for idx, weight in plist:
+                scores[idx] = scores.get(idx, 0) + weight
+        return scores
+
+    def _rank(self, scores, top_k):
+        """Order accumulated scores, best first"""
+        if top_k is not None:
+            # Ties keep corpus order, matching a stable sort over all documents
+            return heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+        ranked = [(idx, scores.get(idx, 0)) for idx in self._live_ids()]
+        return sorted(ranked, key=lambda x: x[1], reverse=True)
+
+    def _rank_maxscore(self, query_tokens, weights, top_k):
+        """Top-k ranking that stops admitting documents once the top-k is settled.
+
+        Terms are processed in decreasing order of their upper bound. Once the
+        bounds of the remaining terms add up to less than the k-th best partial
+        score, no unseen document can reach the top-k, so the remaining
+        postings are skipped and only the surviving candidates are scored.
+        Final scores are summed in query order, so results are identical to
+        _rank(_accumulate(...)). Queries touching fewer than
+        MAXSCORE_MIN_POSTINGS postings are ranked by _accumulate() directly.
+        """
+        counts = {}
+        for token in query_tokens:
+            counts[token] = counts.get(token, 0) + 1
+        entries = []
+        for token in counts:
+            entry = self._postings(token)
+            if entry is not None:
+                entries.append((token,) + entry)
+        if sum(len(plist) for _, _, plist in entries) < MAXSCORE_MIN_POSTINGS:
+            return self._rank(self._accumulate(query_tokens, weights), top_k)
+
+        terms = [(self._upper_bound(token, idf, plist) * counts[token], token, idf, plist)
+                 for token, idf, plist in entries]
+        terms.sort(key=lambda t: t[0], reverse=True)
+
+        k1_plus = self.k1 + 1
+        norms = self.norms
+        remaining = sum(t[0] for t in terms)
+        partial = {}
+        threshold = 0
+        for bound, token, idf, plist in terms:
+            remaining -= bound
+            count = counts[token]
+            for idx, tf in plist:
+                partial[idx] = partial.get(idx, 0) + count * idf * (tf * k1_plus) / (tf + norms[idx])
+            if len(partial) >= top_k:
+                threshold = heapq.nlargest(top_k, partial.values())[-1] * (1 - MAXSCORE_EPSILON)
+                if remaining < threshold:
+                    break
+        # Candidates that cannot reach the k-th partial score even with every
+        # remaining term are dropped before exact scoring
+        candidates = [idx for idx, score in partial.items() if score + remaining >= threshold]
+
+        tfs = {token: dict(plist) for _, token, _, plist in terms}
+        idfs = {token: idf for _, token, idf, _ in terms}
+        scores = {}
+        for idx in candidates:
+            score = 0
             for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+                tf = tfs[token].get(idx) if token in tfs else None
+                if tf:
+                    score += idfs[token] * (tf * k1_plus) / (tf + norms[idx])
+            scores[idx] = score
+        return self._rank(scores, top_k)
+
+    def _live_ids(self):
+        """Ids of indexed documents (skips slots freed by remove_documents)"""
+        if self.N == len(self.doc_lengths):
+            return range(self.N)
+        return [idx for idx, terms in enumerate(self.doc_terms) if terms is not None]
+
+    def _accumulate_numpy(self, query_tokens, weights):
+        """numpy counterpart of _accumulate(): dense score vector over all documents.
+
+        Terms are added one at a time in query order, so every document's
+        sum is computed in the same order as the pure-Python backend.
+        """
+        np = self._np
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float64)
+        for token in query_tokens:
+            if token in weights:
+                entry = weights[token]
+            else:
+                entry = None
+                term_id = self._np_term_ids.get(token)
+                if term_id is not None:
+                    start, end = self._np_indptr[term_id], self._np_indptr[term_id + 1]
+                    docs, tfs = self._np_docs[start:end], self._np_tfs[start:end]
+                    entry = (docs, self._np_idf[term_id] * (tfs * (self.k1 + 1)) / (tfs + self._np_norms[docs]))
+                weights[token] = entry
+            if entry is None:
+                continue
+            docs, contrib = entry
+            scores[docs] += contrib
+        return scores
+
+    def _rank_numpy(self, scores, top_k):
+        """numpy counterpart of _rank(): argpartition for top-k, ties by doc id"""
+        np = self._np
+        if top_k is None:
+            live = np.array(self._live_ids(), dtype=np.int64)
+            order = live[np.argsort(-scores[live], kind="stable")]
+            return [(int(idx), float(scores[idx])) for idx in order]
+
+        candidates = np.flatnonzero(scores > 0)
+        if top_k <= 0:
+            return []
+        if top_k < len(candidates):
+            cand_scores = scores[candidates]
+            kth = cand_scores[np.argpartition(-cand_scores, top_k - 1)[top_k - 1]]
+            # keep every tie at the boundary so doc order can break it
+            candidates = candidates[cand_scores >= kth]
+        order = np.lexsort((candidates, -scores[candidates]))[:top_k]
+        return [(int(candidates[i]), float(scores[candidates[i]])) for i in order]
+
+    def _score_tokens(self, query_tokens, weights, top_k):
+        if self._dirty:
+            self._refresh()
+        if self.backend == "numpy" and self.N:
+            return self._rank_numpy(self._accumulate_numpy(query_tokens, weights), top_k)
+        if top_k is not None and top_k > 0 and self.N >= MAXSCORE_MIN_DOCS and len(query_tokens) > 1:
+            return self._rank_maxscore(query_tokens, weights, top_k)
+        return self._rank(self._accumulate(query_tokens, weights), top_k)
+
+    @profiling.span("BM25.score")
+    def score(self, query, top_k=None):
+        """Score documents against query.
+
+        With ``top_k`` only the best ``top_k`` matching documents (score > 0)
+        are returned, selected with a heap. Without it every document is
+        returned, best first, as ``(idx, score)`` tuples.
+        """
+        return self._score_tokens(self.tokenizer.tokenize_query(query), {}, top_k)
+
+    def iter_ranked(self, query):
+        """Yield (idx, score) for every matching document (score > 0), best first.
+
+        Documents are popped from a heap as the caller consumes them, so
+        reading the first page costs no more than a top-k query.
+        """
+        tokens = self.tokenizer.tokenize_query(query)
+        if self._dirty:
+            self._refresh()
+        if self.backend == "numpy" and self.N:
+            yield from self._rank_numpy(self._accumulate_numpy(tokens, {}), len(self.doc_lengths))
+            return
+        heap = [(-score, idx) for idx, score in self._accumulate(tokens, {}).items()]
+        heapq.heapify(heap)
+        while heap:
+            score, idx = heapq.heappop(heap)
+            yield idx, -score
+
+    @profiling.span("BM25.score_many")
+    def score_many(self, queries, top_k=None):
+        """Score a batch of queries; same output as score() for each one.
+
+        Query tokenization is cached, queries with the same tokens share a
+        ranking, and term weights are computed once for the batch.
+        """
+        weights = {}
+        ranked_by_tokens = {}
+        out = []
+        tokenize_query = self.tokenizer.tokenize_query
+        for query in queries:
+            tokens = tokenize_query(query)
+            ranked = ranked_by_tokens.get(tokens)
+            if ranked is None:
+                ranked = ranked_by_tokens[tokens] = self._score_tokens(tokens, weights, top_k)
+            out.append(ranked)
+        return out
+
+class BM25F(BM25):
+    """Field-weighted BM25 (BM25F) over one text per search column
+
+    Documents are sequences of field texts aligned with ``fields``. Each
+    field's term frequency is length-normalised against that field's own
+    average length, scaled by its weight, and the weighted sum is saturated
+    once per document:
+
+        tf~ = sum(w_f * tf_f / (1 - b + b * len_f / avglen_f))
+        score = sum(idf * tf~ * (k1 + 1) / (tf~ + k1))
+
+    Postings hold per-field term frequencies; _postings() serves tf~, so
+    the BM25 rankers (MaxScore, numpy, iter_ranked) score it unchanged with
+    a document-level b of 0. Fields missing from ``weights`` weigh 1.0.
+    """
+
+    def __init__(self, fields, weights=None, k1=1.5, b=0.75, backend="python", tokenizer=None):
+        # Length normalisation happens per field inside tf~, not per document
+        super().__init__(k1, 0.0, backend, tokenizer)
+        weights = weights or {}
+        self.fields = tuple(fields)
+        self.field_weights = tuple(float(weights.get(field, 1.0)) for field in self.fields)
+        if any(weight <= 0 for weight in self.field_weights):
+            raise ValueError("BM25F field weights must be positive")
+        self.field_b = b
+        self.field_lengths = {}   # doc id -> token count per field
+        self._factors = []        # doc id -> w_f / field length norm, per field
+        self._tf = {}             # term -> [(doc id, tf~), ...], filled as terms are queried
+
+    def _analyze(self, idx, doc):
+        tokenize = self.tokenizer.tokenize
+        n_fields = len(self.fields)
+        term_freqs = {}
+        lengths = []
+        for pos, text in enumerate(doc):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for word in tokens:
+                tfs = term_freqs.get(word)
+                if tfs is None:
+                    tfs = term_freqs[word] = [0] * n_fields
+                tfs[pos] += 1
+        self.field_lengths[idx] = tuple(lengths)
+        return {word: tuple(tfs) for word, tfs in term_freqs.items()}, sum(lengths)
+
+    def remove_documents(self, doc_ids):
+        for idx in doc_ids:
+            self.field_lengths.pop(idx, None)
+        super().remove_documents(doc_ids)
+
+    def _invalidate(self):
+        super()._invalidate()
+        self._tf = {}
+
+    def _refresh(self):
+        """Per-field average lengths and per-document field factors, then BM25's refresh"""
+        factors = [None] * len(self.doc_lengths)
+        if self.N:
+            totals = [0] * len(self.fields)
+            for lengths in self.field_lengths.values():
+                for pos, length in enumerate(lengths):
+                    totals[pos] += length
+            # A field that is empty everywhere never contributes a term
+            averages = [total / self.N or 1.0 for total in totals]
+            b, weights = self.field_b, self.field_weights
+            for idx, lengths in self.field_lengths.items():
+                factors[idx] = tuple(weight / (1 - b + b * length / avg)
+                                     for weight, length, avg in zip(weights, lengths, averages))
+        self._factors = factors
+        self._tf = {}
+        super()._refresh()
+
+    def copy(self):
+        clone = super().copy()
+        clone.field_lengths = dict(self.field_lengths)
+        clone._factors = list(self._factors)
+        clone._tf = dict(self._tf)
+        return clone
+
+    def _postings(self, token):
+        plist = self.postings.get(token)
+        if plist is None:
+            return None
+        tf_list = self._tf.get(token)
+        if tf_list is None:
+            factors = self._factors
+            tf_list = self._tf[token] = [
+                (idx, sum(tf * factor for tf, factor in zip(tfs, factors[idx])))
+                for idx, tfs in plist
+            ]
+        return self._idf(token), tf_list
+
 
-            scores.append((idx, score))
+# ============ ROW STORAGE ============
+class ColumnStore:
+    """CSV rows stored column-wise: one value list per column.
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    Equal cell values share one string object, and indexing returns a
+    RowView instead of a dict, so a loaded corpus costs a handful of lists
+    rather than one dict per row. Rows read like csv.DictReader's: missing
+    trailing cells are None and overflow cells are a list under the key None.
+    """
+
+    __slots__ = ("fields", "columns", "_positions", "_extra")
+
+    def __init__(self, fields, columns, positions, extra):
+        self.fields = fields
+        self.columns = columns
+        self._positions = positions
+        self._extra = extra
+
+    @classmethod
+    def from_csv(cls, f):
+        """Read a CSV file object (first line is the header)"""
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        # Duplicate header names behave like dict(zip(...)): the last one wins
+        positions = {name: pos for pos, name in enumerate(header)}
+        width = len(header)
+        records = [record for record in reader if record]
+        extra = {}
+        intern = sys.intern
+        for idx, record in enumerate(records):
+            if len(record) != width:
+                # Ragged row: pad missing cells with None, keep overflow cells aside
+                if len(record) > width:
+                    extra[idx] = record[width:]
+                records[idx] = record[:width] + [None] * (width - len(record))
+                intern = _intern_cell
+        # Interned cells: repeated values (categories, severities...) share one object
+        columns = [list(map(intern, column)) for column in zip(*records)] if records else [[] for _ in header]
+        return cls(list(dict.fromkeys(header)), columns, positions, extra)
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [RowView(self, i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("row index out of range")
+        return RowView(self, idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield RowView(self, idx)
+
+
+def _intern_cell(value):
+    return value if value is None else sys.intern(value)
+
+
+class RowView(Mapping):
+    """Read-only mapping view of one ColumnStore row"""
+
+    __slots__ = ("_store", "_idx")
+
+    def __init__(self, store, idx):
+        self._store = store
+        self._idx = idx
+
+    def __getitem__(self, key):
+        store = self._store
+        pos = store._positions.get(key)
+        if pos is not None:
+            return store.columns[pos][self._idx]
+        if key is None and self._idx in store._extra:
+            return store._extra[self._idx]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        pos = self._store._positions.get(key)
+        if pos is not None:
+            return self._store.columns[pos][self._idx]
+        return self._store._extra.get(self._idx, default) if key is None else default
+
+    def __contains__(self, key):
+        return key in self._store._positions or (key is None and self._idx in self._store._extra)
+
+    def __iter__(self):
+        yield from self._store.fields
+        if self._idx in self._store._extra:
+            yield None
+
+    def __len__(self):
+        return len(self._store.fields) + (self._idx in self._store._extra)
+
+    def __repr__(self):
+        return f"RowView({dict(self)!r})"
+
+
+def estimate_size(obj):
+    """Approximate deep size in bytes; shared objects are counted once"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+        elif isinstance(item, ColumnStore):
+            stack.extend((item.fields, item.columns, item._positions, item._extra))
+    return total
+
+
+def memory_report():
+    """(file, rows, dict-rows bytes, column-store bytes) for every domain and stack CSV"""
+    report = []
+    for rel_file in [c["file"] for c in CSV_CONFIG.values()] + [c["file"] for c in STACK_CONFIG.values()]:
+        filepath = DATA_DIR / rel_file
+        if not filepath.exists():
+            continue
+        with open(filepath, 'r', encoding='utf-8') as f:
+            dict_rows = list(csv.DictReader(f))
+        store = _load_csv(filepath)
+        report.append((rel_file, len(store), estimate_size(dict_rows), estimate_size(store)))
+    return report
+
+
+# ============ INDEX CACHE ============
+class CsvIndex:
+    """Rows of one CSV plus the BM25 index fitted over its search columns
+
+    With ``field_weights`` the index is a BM25F over one field per column.
+    """
+
+    def __init__(self, filepath, search_cols, signature, rows, bm25, field_weights=None):
+        self.filepath = filepath
+        self.search_cols = search_cols
+        self.signature = signature
+        self.rows = rows
+        self.bm25 = bm25
+        self.field_weights = field_weights
+
+    def refreshed(self, signature):
+        """Copy of this index updated to the CSV's current contents.
+
+        Rows are compared by position: only rows whose search text changed,
+        and rows appended or dropped at the end, are re-indexed. Unchanged
+        rows keep their postings, so the result ranks exactly like a full
+        rebuild.
+        """
+        data = _load_csv(self.filepath)
+        old_rows, cols, weights = self.rows, self.search_cols, self.field_weights
+        common = min(len(old_rows), len(data))
+        changed = [idx for idx in range(common)
+                   if _row_document(old_rows[idx], cols, weights) != _row_document(data[idx], cols, weights)]
+
+        bm25 = self.bm25.copy()
+        bm25.remove_documents(changed + list(range(common, len(old_rows))))
+        bm25.add_documents([_row_document(data[idx], cols, weights) for idx in changed], doc_ids=changed)
+        bm25.add_documents([_row_document(row, cols, weights) for row in data[common:]])
+        return CsvIndex(self.filepath, cols, signature, data, bm25, weights)
+
+
+# (filepath, search_cols, field weights) -> CsvIndex, shared by every search in the process
+_INDEX_CACHE = {}
+_INDEX_LOCK = threading.Lock()
+
+# Precompiled index file (binary_index.IndexFile), see enable_precompiled()
+_precompiled = None
+
+
+def _file_signature(filepath):
+    """Cheap change detector for a CSV: (mtime_ns, size)"""
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _row_document(row, search_cols, field_weights=None):
+    """Indexed text of a row: its search columns joined by spaces, or one
+    text per column for a field-weighted index"""
+    if field_weights:
+        return tuple(str(row.get(col, "")) for col in search_cols)
+    return " ".join(str(row.get(col, "")) for col in search_cols)
+
+
+def _weights_key(field_weights):
+    """Hashable form of a field_weights mapping (None for plain BM25)"""
+    return tuple(sorted(field_weights.items())) if field_weights else None
+
+
+def _build_index(filepath, search_cols, signature, field_weights=None):
+    """Load CSV and fit BM25 over the concatenated search columns (BM25F over
+    the individual columns with ``field_weights``)"""
+    data = _load_csv(filepath)
+    documents = [_row_document(row, search_cols, field_weights) for row in data]
+    if field_weights:
+        bm25 = BM25F(search_cols, field_weights, backend=BM25_BACKEND)
+    else:
+        bm25 = BM25(backend=BM25_BACKEND)
+    bm25.fit(documents)
+    return CsvIndex(filepath, search_cols, signature, data, bm25, field_weights)
+
+
+def get_index(filepath, search_cols, field_weights=None):
+    """Return the cached index for a CSV, updating it if the file changed"""
+    key = (str(filepath), tuple(search_cols), _weights_key(field_weights))
+    signature = _file_signature(filepath)
+    index = _INDEX_CACHE.get(key)
+    if index is not None and index.signature == signature:
+        profiling.count("index.hit")
+        return index
+
+    with _INDEX_LOCK:
+        index, _ = _reuse_index(key, filepath, search_cols, field_weights, signature)
+        if index is None:
+            profiling.count("index.build")
+            index = _INDEX_CACHE[key] = _build_index(filepath, search_cols, signature, field_weights)
+    return index
+
+
+def _reuse_index(key, filepath, search_cols, field_weights, signature, precompiled=True):
+    """(index, how) without a full build, or (None, None) if one is needed.
+
+    ``how`` is "cached", "refreshed" (incremental update of a stale cached
+    index) or "precompiled". With ``precompiled=False`` indexes from the
+    precompiled file, cached or not, count as missing. Callers hold
+    _INDEX_LOCK.
+    """
+    index = _INDEX_CACHE.get(key)
+    if index is not None and not precompiled and not index.bm25.mutable:
+        index = None
+    if index is not None and index.signature == signature:
+        profiling.count("index.hit")
+        return index, "cached"
+    if index is not None and index.bm25.mutable:
+        # Swap in an updated copy so in-flight queries keep a consistent index
+        profiling.count("index.refresh")
+        index = _INDEX_CACHE[key] = index.refreshed(signature)
+        return index, "refreshed"
+    index = _precompiled.lookup(filepath, search_cols, signature, field_weights) if _precompiled and precompiled else None
+    if index is not None:
+        profiling.count("index.precompiled")
+        _INDEX_CACHE[key] = index
+        return index, "precompiled"
+    return None, None
+
+
+def _index_sources():
+    """(relative file, search_cols, field_weights) for every domain and stack CSV"""
+    sources = [(config["file"], config["search_cols"], config.get("field_weights")) for config in CSV_CONFIG.values()]
+    sources += [(config["file"], _STACK_COLS["search_cols"], None) for config in STACK_CONFIG.values()]
+    return sources
+
+
+def _build_job(job):
+    """Process pool worker: parse, tokenize and fit one CSV"""
+    filepath, search_cols, field_weights, signature = job
+    start = perf_counter()
+    index = _build_index(filepath, search_cols, signature, field_weights)
+    return index, perf_counter() - start
+
+
+@profiling.span("core.build_indexes")
+def build_indexes(processes=None, precompiled=True):
+    """Load the index of every domain and stack CSV, building missing ones in parallel.
+
+    Indexes that are cached, can be refreshed incrementally or are in the
+    precompiled file (unless ``precompiled`` is False, which makes every
+    index a fitted in-memory one) are reused; the rest are parsed, tokenized and fitted
+    across a process pool (``processes`` workers, default: CPU count) and
+    merged into the shared index cache. The pool is skipped for one worker
+    or when the CSVs to build total less than PARALLEL_BUILD_MIN_BYTES.
+
+    Returns [(relative file, rows, terms, seconds, how)] in CSV_CONFIG then
+    STACK_CONFIG order; ``how`` is "built" or as in _reuse_index().
+    """
+    sources, loaded, jobs = [], {}, {}
+    with _INDEX_LOCK:
+        for rel_file, search_cols, field_weights in _index_sources():
+            filepath = DATA_DIR / rel_file
+            if not filepath.exists():
+                continue
+            key = (str(filepath), tuple(search_cols), _weights_key(field_weights))
+            sources.append((rel_file, key))
+            signature = _file_signature(filepath)
+            start = perf_counter()
+            index, how = _reuse_index(key, filepath, search_cols, field_weights, signature, precompiled)
+            if index is None:
+                jobs[key] = (filepath, search_cols, field_weights, signature)
+            else:
+                loaded[key] = (index, perf_counter() - start, how)
+
+    if jobs:
+        # Largest files first so no worker is left with a big file at the end
+        order = sorted(jobs, key=lambda key: jobs[key][3][1], reverse=True)
+        workers = min(processes or os.cpu_count() or 1, len(order))
+        if workers > 1 and sum(jobs[key][3][1] for key in order) >= PARALLEL_BUILD_MIN_BYTES:
+            # Imported here: it pulls in multiprocessing, which searches never need
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                built = list(pool.map(_build_job, [jobs[key] for key in order]))
+        else:
+            built = [_build_job(jobs[key]) for key in order]
+
+        with _INDEX_LOCK:
+            for key, (index, seconds) in zip(order, built):
+                profiling.count("index.build")
+                current = _INDEX_CACHE.get(key)
+                # Keep an index another thread built meanwhile from the same data
+                if current is None or current.signature != index.signature or not current.bm25.mutable:
+                    _INDEX_CACHE[key] = index
+                loaded[key] = (_INDEX_CACHE[key], seconds, "built")
+
+    report = []
+    for rel_file, key in sources:
+        index, seconds, how = loaded[key]
+        report.append((rel_file, index.bm25.N, index.bm25.vocab_size(), seconds, how))
+    return report
+
+
+def enable_precompiled(path=None):
+    """Serve cache misses from the memory-mapped precompiled index file.
+
+    Sections whose CSV changed since the build are ignored and rebuilt from
+    the CSV. Returns False if no usable index file exists.
+    """
+    global _precompiled
+    from binary_index import load_index_file
+    _precompiled = load_index_file(path)
+    return _precompiled is not None
+
+
+def warm_all(processes=None):
+    """Preload the index of every domain and stack CSV that exists (see build_indexes)"""
+    return build_indexes(processes)
+
+
+def clear_cache():
+    """Drop all cached indexes"""
+    with _INDEX_LOCK:
+        _INDEX_CACHE.clear()
 
 
 # ============ SEARCH FUNCTIONS ============
+@profiling.span("core._load_csv")
 def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
+    """Load CSV into a ColumnStore (a sequence of dict-like rows)"""
     with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+        return ColumnStore.from_csv(f)
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
+def _search_csv(filepath, search_cols, output_cols, query, max_results, field_weights=None):
     """Core search function using BM25"""
     if not filepath.exists():
         return []
 
-    data = _load_csv(filepath)
+    index = get_index(filepath, search_cols, field_weights)
+    ranked = index.bm25.score(query, top_k=max_results)
+    return _format_hits(index.rows, ranked, output_cols)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
-
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
+def _format_hits(data, ranked, output_cols):
+    """Project ranked rows onto output columns (only score > 0 is ranked)"""
     results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
-
+    for idx, score in ranked:
+        row = data[idx]
+        results.append({col: row.get(col, "") for col in output_cols if col in row})
     return results
 
 
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "prompt": ["prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
-
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
+    return _detect_domain_cached(query)
 
 
+@profiling.span("core.search")
 def search(query, domain=None, max_results=MAX_RESULTS):
     """Main search function with auto-domain detection"""
     if domain is None:
@@ -224,7 +1101,8 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results,
+                          config.get("field_weights"))
 
     return {
         "domain": domain,
@@ -235,6 +1113,64 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     }
 
 
+def search_iter(query, domain=None):
+    """Lazily yield search() results, best first, with no result limit.
+
+    Rows are ranked and formatted only as the caller consumes them, for
+    callers that page through results.
+    """
+    if domain is None:
+        domain = detect_domain(query)
+
+    config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+    filepath = DATA_DIR / config["file"]
+    if not filepath.exists():
+        return
+
+    index = get_index(filepath, config["search_cols"], config.get("field_weights"))
+    output_cols = config["output_cols"]
+    for idx, _ in index.bm25.iter_ranked(query):
+        yield _format_hits(index.rows, [(idx, 0)], output_cols)[0]
+
+
+def search_many(queries, domain=None, max_results=MAX_RESULTS):
+    """Batch version of search(): one result dict per query, in input order.
+
+    Queries are grouped by (detected) domain and each group is scored
+    against the shared cached index in one pass.
+    """
+    queries = list(queries)
+    results = [None] * len(queries)
+
+    groups = defaultdict(list)
+    for pos, query in enumerate(queries):
+        groups[domain if domain is not None else detect_domain(query)].append(pos)
+
+    for group_domain, positions in groups.items():
+        config = CSV_CONFIG.get(group_domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+
+        if not filepath.exists():
+            for pos in positions:
+                results[pos] = {"error": f"File not found: {filepath}", "domain": group_domain}
+            continue
+
+        index = get_index(filepath, config["search_cols"], config.get("field_weights"))
+        rankings = index.bm25.score_many([queries[pos] for pos in positions], top_k=max_results)
+        for pos, ranked in zip(positions, rankings):
+            hits = _format_hits(index.rows, ranked, config["output_cols"])
+            results[pos] = {
+                "domain": group_domain,
+                "query": queries[pos],
+                "file": config["file"],
+                "count": len(hits),
+                "results": hits
+            }
+
+    return results
+
+
+@profiling.span("core.search_stack")
 def search_stack(query, stack, max_results=MAX_RESULTS):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
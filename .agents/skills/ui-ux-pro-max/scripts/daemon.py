@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Daemon - keeps every index hot in one long-running process and answers
+thin clients over a localhost socket, so each CLI call skips indexing.
+
+Usage:
+    python search.py --serve [--port 7654]    # start the daemon
+    python search.py "<query>" [...]          # uses the daemon when it is running
+
+Protocol: one JSON object per line in each direction.
+    {"op": "search", "query": ..., "domain": ..., "max_results": ...}
+    {"op": "search_stack", "query": ..., "stack": ..., "max_results": ...}
+    {"op": "design_system", "query": ..., "project_name": ..., "format": ...}
+    {"op": "ping"}
+Search responses are the same dicts search.py prints with --json; the
+design system response is {"output": "<formatted text>"}. Clients ping
+first and only send the request once the reply names SERVICE, so another
+program on the port sends them back to in-process search quickly.
+"""
+
+import json
+import os
+import socket
+import socketserver
+
+# core is imported by the server side only, so thin clients start fast
+from config import MAX_RESULTS
+
+
+# ============ CONFIGURATION ============
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("UI_PRO_MAX_PORT", "7654"))
+CONNECT_TIMEOUT = 0.2  # seconds; a refused connect returns immediately
+PING_TIMEOUT = 0.5     # seconds for the daemon to answer the opening ping
+REQUEST_TIMEOUT = 30
+MAX_PING_REPLY = 4096  # bytes; a longer first line is not the daemon
+SERVICE = "ui-ux-pro-max"
+
+
+# ============ SERVER ============
+def handle_request(request):
+    """Dispatch one protocol request to the in-process search functions"""
+    from core import search, search_stack
+    op = request.get("op", "search")
+    if op == "search":
+        return search(request["query"], request.get("domain"), request.get("max_results", MAX_RESULTS))
+    if op == "search_stack":
+        return search_stack(request["query"], request["stack"], request.get("max_results", MAX_RESULTS))
+    if op == "design_system":
+        from design_system import generate_design_system
+        return {"output": generate_design_system(request["query"], request.get("project_name"),
+                                                 request.get("format", "ascii"))}
+    if op == "ping":
+        return {"status": "ok", "service": SERVICE, "pid": os.getpid()}
+    return {"error": f"Unknown op: {op}"}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers JSON-lines requests until the client closes the connection"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = handle_request(json.loads(line))
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class SearchServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, processes=None):
+    """Build every index in memory (across ``processes``) and serve requests until interrupted.
+
+    The precompiled file is not used: its memory-mapped indexes decode rows
+    and look up terms on every query, which suits short CLI processes but
+    makes a long-running daemon's warm queries slower.
+    """
+    from core import warm_all
+    report = warm_all(processes)
+    built = sum(1 for entry in report if entry[4] == "built")
+    print(f"Loaded {len(report)} indexes ({built} built) in {sum(entry[3] for entry in report) * 1000:.1f} ms")
+    with SearchServer((host, port), _RequestHandler) as server:
+        print(f"UI Pro Max search daemon listening on {host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ============ CLIENT ============
+def _reply(f, limit=-1):
+    """Next response line as a dict, or None if it is missing or not a JSON object"""
+    try:
+        response = json.loads(f.readline(limit))
+    except ValueError:  # includes invalid JSON, bad UTF-8 and an empty reply
+        return None
+    return response if isinstance(response, dict) else None
+
+
+def request(payload, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Send one request to a running daemon.
+
+    Returns the decoded response, or None if no daemon answered (nothing
+    listening, or something else on the port) so the caller can fall back
+    to searching in-process.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=CONNECT_TIMEOUT) as sock:
+            sock.settimeout(PING_TIMEOUT)
+            with sock.makefile("rb") as f:
+                sock.sendall(b'{"op": "ping"}\n')
+                pong = _reply(f, MAX_PING_REPLY)
+                if pong is None or pong.get("service") != SERVICE:
+                    return None
+                sock.settimeout(REQUEST_TIMEOUT)
+                sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+                return _reply(f)
+    except OSError:  # refused, reset or timed out
+        return None
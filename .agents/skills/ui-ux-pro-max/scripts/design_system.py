@@ -11,12 +11,19 @@ Usage:
 
 import csv
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from core import search, DATA_DIR
+import profiling
+from core import search, enable_precompiled, warm_all, CSV_CONFIG, DATA_DIR, _file_signature
+from result_cache import get_cache, normalize_query
 
 
 # ============ CONFIGURATION ============
 REASONING_FILE = "ui-reasoning.csv"
+MAX_RESOLVED_CATEGORIES = 4096
 
 SEARCH_CONFIG = {
     "product": {"max_results": 1},
@@ -26,58 +33,145 @@ SEARCH_CONFIG = {
     "typography": {"max_results": 2}
 }
 
+# Shared pool for the per-domain fan-out; indexes themselves are cached in core
+_search_pool = None
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    if _search_pool is None:
+        _search_pool = ThreadPoolExecutor(max_workers=len(SEARCH_CONFIG), thread_name_prefix="ds-search")
+    return _search_pool
+
+
+def _reset_search_pool():
+    """A forked child inherits the pool object but not its threads."""
+    global _search_pool
+    _search_pool = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_search_pool)
+
+
+# ============ REASONING RULES ============
+class ReasoningRules:
+    """Reasoning rules from ui-reasoning.csv with lookup structures built once."""
+
+    def __init__(self, rules: list, signature: tuple = None):
+        self.rules = rules
+        self.signature = signature
+        self.categories = [rule.get("UI_Category", "").lower() for rule in rules]
+
+        # lowercase UI_Category -> first rule index (exact match)
+        self.by_category = {}
+        # keyword -> first rule index containing it (keyword match)
+        self.keyword_index = {}
+        for idx, ui_cat in enumerate(self.categories):
+            self.by_category.setdefault(ui_cat, idx)
+            for kw in ui_cat.replace("/", " ").replace("-", " ").split():
+                self.keyword_index.setdefault(kw, idx)
+
+        # category_lower -> resolved rule index (or None), filled on demand
+        self._resolved = {}
+        # raw Decision_Rules JSON -> parsed dict
+        self._decision_rules = {}
+
+    def _resolve(self, category_lower: str):
+        """Rule index for a category: exact, then containment, then keyword match."""
+        idx = self.by_category.get(category_lower)
+        if idx is not None:
+            return idx
+
+        for idx, ui_cat in enumerate(self.categories):
+            if ui_cat in category_lower or category_lower in ui_cat:
+                return idx
+
+        matches = [idx for kw, idx in self.keyword_index.items() if kw in category_lower]
+        return min(matches) if matches else None
+
+    def find(self, category: str) -> dict:
+        """Find matching reasoning rule for a category ({} if none)."""
+        category_lower = category.lower()
+        if category_lower in self._resolved:
+            profiling.count("reasoning.find.hit")
+            idx = self._resolved[category_lower]
+        else:
+            profiling.count("reasoning.find.miss")
+            if len(self._resolved) >= MAX_RESOLVED_CATEGORIES:
+                self._resolved.clear()
+            idx = self._resolved[category_lower] = self._resolve(category_lower)
+        return self.rules[idx] if idx is not None else {}
+
+    def decision_rules(self, rule: dict) -> dict:
+        """Parsed Decision_Rules JSON of a rule, parsed once per rule."""
+        raw = rule.get("Decision_Rules", "{}")
+        parsed = self._decision_rules.get(raw)
+        if parsed is None:
+            profiling.count("reasoning.decision_rules.miss")
+            try:
+                parsed = json.loads(raw)
+            except json.JSONDecodeError:
+                parsed = {}
+            self._decision_rules[raw] = parsed
+        else:
+            profiling.count("reasoning.decision_rules.hit")
+        return dict(parsed)
+
+
+_reasoning_rules = None
+_reasoning_lock = threading.Lock()
+
+
+def get_reasoning_rules() -> ReasoningRules:
+    """Process-wide reasoning rules, reloaded only when the CSV changes."""
+    global _reasoning_rules
+    filepath = DATA_DIR / REASONING_FILE
+    signature = _file_signature(filepath) if filepath.exists() else None
+    rules = _reasoning_rules
+    if rules is not None and rules.signature == signature:
+        profiling.count("reasoning.rules.hit")
+        return rules
+
+    with _reasoning_lock:
+        if _reasoning_rules is None or _reasoning_rules.signature != signature:
+            profiling.count("reasoning.rules.load")
+            data = []
+            if signature is not None:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = list(csv.DictReader(f))
+            _reasoning_rules = ReasoningRules(data, signature)
+        return _reasoning_rules
+
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
     def __init__(self):
-        self.reasoning_data = self._load_reasoning()
-
-    def _load_reasoning(self) -> list:
-        """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
-
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+        self.reasoning = get_reasoning_rules()
+        self.reasoning_data = self.reasoning.rules
+
+    def _multi_domain_search(self, query: str, style_priority: list = None, exclude: tuple = ()) -> dict:
+        """Execute searches across multiple domains concurrently."""
+        pool = _get_search_pool()
+        futures = {}
         for domain, config in SEARCH_CONFIG.items():
+            if domain in exclude:
+                continue
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
+                priority_query = " ".join(style_priority[:2])
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                futures[domain] = pool.submit(search, combined_query, domain, config["max_results"])
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                futures[domain] = pool.submit(search, query, domain, config["max_results"])
+        return {domain: future.result() for domain, future in futures.items()}
 
+    @profiling.span("DesignSystemGenerator._find_reasoning_rule")
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        return self.reasoning.find(category)
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
@@ -95,12 +189,8 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
+        # Parse decision rules JSON (cached per rule)
+        decision_rules = self.reasoning.decision_rules(rule)
 
         return {
             "pattern": rule.get("Recommended_Pattern", ""),
@@ -113,6 +203,7 @@ class DesignSystemGenerator:
             "severity": rule.get("Severity", "MEDIUM")
         }
 
+    @profiling.span("DesignSystemGenerator._select_best_match")
     def _select_best_match(self, results: list, priority_keywords: list) -> dict:
         """Select best matching result based on priority keywords."""
         if not results:
@@ -121,7 +212,7 @@ class DesignSystemGenerator:
         if not priority_keywords:
             return results[0]
 
-        # First: try exact style name match
+        # Exact style name match, in priority order
         for priority in priority_keywords:
             priority_lower = priority.lower().strip()
             for result in results:
@@ -129,7 +220,12 @@ class DesignSystemGenerator:
                 if priority_lower in style_name or style_name in priority_lower:
                     return result
 
-        # Second: score by keyword match in all fields
+        # With field weights the style index already ranks "Style Category"
+        # and "Keywords" matches above other columns, so its order stands
+        if CSV_CONFIG["style"].get("field_weights"):
+            return results[0]
+
+        # Otherwise score by keyword match in all fields
         scored = []
         for result in results:
             result_str = str(result).lower()
@@ -154,6 +250,7 @@ class DesignSystemGenerator:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
+    @profiling.span("DesignSystemGenerator.generate")
     def generate(self, query: str, project_name: str = None) -> dict:
         """Generate complete design system recommendation."""
         # Step 1: First search product to get category
@@ -168,7 +265,7 @@ class DesignSystemGenerator:
         style_priority = reasoning.get("style_priority", [])
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
+        search_results = self._multi_domain_search(query, style_priority, exclude=("product",))
         search_results["product"] = product_result  # Reuse product search
 
         # Step 4: Select best matches from each domain using priority
@@ -232,9 +329,58 @@ class DesignSystemGenerator:
 
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
-
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as ASCII box with emojis (MCP-style)."""
+WRAP_CACHE_SIZE = 4096
+
+CHECKLIST_ITEMS = (
+    "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
+    "[ ] cursor-pointer on all clickable elements",
+    "[ ] Hover states with smooth transitions (150-300ms)",
+    "[ ] Light mode: text contrast 4.5:1 minimum",
+    "[ ] Focus states visible for keyboard nav",
+    "[ ] prefers-reduced-motion respected",
+    "[ ] Responsive: 375px, 768px, 1024px, 1440px"
+)
+
+# Static box fragments, rendered once
+_BOX_BORDER = "+" + "-" * (BOX_WIDTH - 1) + "+"
+_BOX_BLANK = "|" + " " * BOX_WIDTH + "|"
+_BOX_INDENT = "|     "
+_BOX_SECTIONS_LABEL = "|     Sections:".ljust(BOX_WIDTH) + "|"
+_BOX_COLORS_LABEL = "|  COLORS:".ljust(BOX_WIDTH) + "|"
+_BOX_EFFECTS_LABEL = "|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|"
+_BOX_AVOID_LABEL = "|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|"
+# Checklist through the closing border, as one fragment
+_BOX_FOOTER = "\n".join(
+    ["|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|"]
+    + [f"{_BOX_INDENT}{item}".ljust(BOX_WIDTH) + "|" for item in CHECKLIST_ITEMS]
+    + [_BOX_BLANK, _BOX_BORDER]
+)
+_MD_FOOTER = "\n".join(["### Pre-Delivery Checklist"] + [f"- {item}" for item in CHECKLIST_ITEMS] + [""])
+
+
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def wrap_text(text: str, prefix: str, width: int) -> tuple:
+    """Greedily wrap text into lines of at most width - 2 characters, each starting with prefix."""
+    limit = width - 2
+    lines = []
+    words = []
+    length = len(prefix)
+    for word in text.split():
+        if length + len(word) + 1 <= limit:
+            length += len(word) + (1 if words else 0)
+            words.append(word)
+        else:
+            if words:
+                lines.append(prefix + " ".join(words))
+            words = [word]
+            length = len(prefix) + len(word)
+    if words:
+        lines.append(prefix + " ".join(words))
+    return tuple(lines)
+
+
+def _box_rows(design_system: dict):
+    """Yield the ASCII box line by line (static blocks as multi-line fragments)."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -243,123 +389,85 @@ def format_ascii_box(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
-            else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
+    def row(text: str) -> str:
+        return text.ljust(BOX_WIDTH) + "|"
+
+    def wrapped(text: str):
+        for line in wrap_text(text, _BOX_INDENT, BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
 
     # Build sections from pattern
     sections = pattern.get("sections", "").split(">")
     sections = [s.strip() for s in sections if s.strip()]
 
-    # Build output lines
-    lines = []
-    w = BOX_WIDTH - 1
-
-    lines.append("+" + "-" * w + "+")
-    lines.append(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM".ljust(BOX_WIDTH) + "|")
-    lines.append("+" + "-" * w + "+")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+    yield _BOX_BORDER
+    yield row(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM")
+    yield _BOX_BORDER
+    yield _BOX_BLANK
 
     # Pattern section
-    lines.append(f"|  PATTERN: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "|")
+    yield row(f"|  PATTERN: {pattern.get('name', '')}")
     if pattern.get('conversion'):
-        lines.append(f"|     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "|")
+        yield row(f"|     Conversion: {pattern.get('conversion', '')}")
     if pattern.get('cta_placement'):
-        lines.append(f"|     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append("|     Sections:".ljust(BOX_WIDTH) + "|")
+        yield row(f"|     CTA: {pattern.get('cta_placement', '')}")
+    yield _BOX_SECTIONS_LABEL
     for i, section in enumerate(sections, 1):
-        lines.append(f"|       {i}. {section}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield row(f"|       {i}. {section}")
+    yield _BOX_BLANK
 
     # Style section
-    lines.append(f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|")
+    yield row(f"|  STYLE: {style.get('name', '')}")
     if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        yield from wrapped(f"Keywords: {style.get('keywords', '')}")
     if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        yield from wrapped(f"Best For: {style.get('best_for', '')}")
     if style.get("performance") or style.get("accessibility"):
         perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
-        lines.append(f"|     {perf_a11y}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield row(f"|     {perf_a11y}")
+    yield _BOX_BLANK
 
     # Colors section
-    lines.append("|  COLORS:".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Primary:    {colors.get('primary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Secondary:  {colors.get('secondary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     CTA:        {colors.get('cta', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|")
+    yield _BOX_COLORS_LABEL
+    yield row(f"|     Primary:    {colors.get('primary', '')}")
+    yield row(f"|     Secondary:  {colors.get('secondary', '')}")
+    yield row(f"|     CTA:        {colors.get('cta', '')}")
+    yield row(f"|     Background: {colors.get('background', '')}")
+    yield row(f"|     Text:       {colors.get('text', '')}")
     if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield from wrapped(f"Notes: {colors.get('notes', '')}")
+    yield _BOX_BLANK
 
     # Typography section
-    lines.append(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|")
+    yield row(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}")
     if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        yield from wrapped(f"Mood: {typography.get('mood', '')}")
     if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        yield from wrapped(f"Best For: {typography.get('best_for', '')}")
     if typography.get("google_fonts_url"):
-        lines.append(f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|")
+        yield row(f"|     Google Fonts: {typography.get('google_fonts_url', '')}")
     if typography.get("css_import"):
-        lines.append(f"|     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield row(f"|     CSS Import: {typography.get('css_import', '')[:70]}...")
+    yield _BOX_BLANK
 
     # Key Effects section
     if effects:
-        lines.append("|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(effects, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
+        yield _BOX_EFFECTS_LABEL
+        yield from wrapped(effects)
+        yield _BOX_BLANK
 
     # Anti-patterns section
     if anti_patterns:
-        lines.append("|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(anti_patterns, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Pre-Delivery Checklist section
-    lines.append("|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|")
-    checklist_items = [
-        "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
-        "[ ] cursor-pointer on all clickable elements",
-        "[ ] Hover states with smooth transitions (150-300ms)",
-        "[ ] Light mode: text contrast 4.5:1 minimum",
-        "[ ] Focus states visible for keyboard nav",
-        "[ ] prefers-reduced-motion respected",
-        "[ ] Responsive: 375px, 768px, 1024px, 1440px"
-    ]
-    for item in checklist_items:
-        lines.append(f"|     {item}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield _BOX_AVOID_LABEL
+        yield from wrapped(anti_patterns)
+        yield _BOX_BLANK
 
-    lines.append("+" + "-" * w + "+")
+    # Pre-Delivery Checklist section and closing border
+    yield _BOX_FOOTER
 
-    return "\n".join(lines)
 
-
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
+def _markdown_rows(design_system: dict):
+    """Yield the markdown document line by line (static blocks as multi-line fragments)."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -368,94 +476,129 @@ def format_markdown(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    lines = []
-    lines.append(f"## Design System: {project}")
-    lines.append("")
+    yield f"## Design System: {project}"
+    yield ""
 
     # Pattern section
-    lines.append("### Pattern")
-    lines.append(f"- **Name:** {pattern.get('name', '')}")
+    yield "### Pattern"
+    yield f"- **Name:** {pattern.get('name', '')}"
     if pattern.get('conversion'):
-        lines.append(f"- **Conversion Focus:** {pattern.get('conversion', '')}")
+        yield f"- **Conversion Focus:** {pattern.get('conversion', '')}"
     if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
+        yield f"- **CTA Placement:** {pattern.get('cta_placement', '')}"
     if pattern.get('color_strategy'):
-        lines.append(f"- **Color Strategy:** {pattern.get('color_strategy', '')}")
-    lines.append(f"- **Sections:** {pattern.get('sections', '')}")
-    lines.append("")
+        yield f"- **Color Strategy:** {pattern.get('color_strategy', '')}"
+    yield f"- **Sections:** {pattern.get('sections', '')}"
+    yield ""
 
     # Style section
-    lines.append("### Style")
-    lines.append(f"- **Name:** {style.get('name', '')}")
+    yield "### Style"
+    yield f"- **Name:** {style.get('name', '')}"
     if style.get('keywords'):
-        lines.append(f"- **Keywords:** {style.get('keywords', '')}")
+        yield f"- **Keywords:** {style.get('keywords', '')}"
     if style.get('best_for'):
-        lines.append(f"- **Best For:** {style.get('best_for', '')}")
+        yield f"- **Best For:** {style.get('best_for', '')}"
     if style.get('performance') or style.get('accessibility'):
-        lines.append(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}")
-    lines.append("")
+        yield f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}"
+    yield ""
 
     # Colors section
-    lines.append("### Colors")
-    lines.append(f"| Role | Hex |")
-    lines.append(f"|------|-----|")
-    lines.append(f"| Primary | {colors.get('primary', '')} |")
-    lines.append(f"| Secondary | {colors.get('secondary', '')} |")
-    lines.append(f"| CTA | {colors.get('cta', '')} |")
-    lines.append(f"| Background | {colors.get('background', '')} |")
-    lines.append(f"| Text | {colors.get('text', '')} |")
+    yield "### Colors\n| Role | Hex |\n|------|-----|"
+    yield f"| Primary | {colors.get('primary', '')} |"
+    yield f"| Secondary | {colors.get('secondary', '')} |"
+    yield f"| CTA | {colors.get('cta', '')} |"
+    yield f"| Background | {colors.get('background', '')} |"
+    yield f"| Text | {colors.get('text', '')} |"
     if colors.get("notes"):
-        lines.append(f"\n*Notes: {colors.get('notes', '')}*")
-    lines.append("")
+        yield f"\n*Notes: {colors.get('notes', '')}*"
+    yield ""
 
     # Typography section
-    lines.append("### Typography")
-    lines.append(f"- **Heading:** {typography.get('heading', '')}")
-    lines.append(f"- **Body:** {typography.get('body', '')}")
+    yield "### Typography"
+    yield f"- **Heading:** {typography.get('heading', '')}"
+    yield f"- **Body:** {typography.get('body', '')}"
     if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
+        yield f"- **Mood:** {typography.get('mood', '')}"
     if typography.get("best_for"):
-        lines.append(f"- **Best For:** {typography.get('best_for', '')}")
+        yield f"- **Best For:** {typography.get('best_for', '')}"
     if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}")
+        yield f"- **Google Fonts:** {typography.get('google_fonts_url', '')}"
     if typography.get("css_import"):
-        lines.append(f"- **CSS Import:**")
-        lines.append(f"```css")
-        lines.append(f"{typography.get('css_import', '')}")
-        lines.append(f"```")
-    lines.append("")
+        yield "- **CSS Import:**\n```css"
+        yield f"{typography.get('css_import', '')}"
+        yield "```"
+    yield ""
 
     # Key Effects section
     if effects:
-        lines.append("### Key Effects")
-        lines.append(f"{effects}")
-        lines.append("")
+        yield "### Key Effects"
+        yield f"{effects}"
+        yield ""
 
     # Anti-patterns section
     if anti_patterns:
-        lines.append("### Avoid (Anti-patterns)")
-        lines.append(f"- {anti_patterns.replace(' + ', '\n- ')}")
-        lines.append("")
+        yield "### Avoid (Anti-patterns)"
+        anti_pattern_items = anti_patterns.replace(' + ', '\n- ')
+        yield f"- {anti_pattern_items}"
+        yield ""
 
     # Pre-Delivery Checklist section
-    lines.append("### Pre-Delivery Checklist")
-    lines.append("- [ ] No emojis as icons (use SVG: Heroicons/Lucide)")
-    lines.append("- [ ] cursor-pointer on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard nav")
-    lines.append("- [ ] prefers-reduced-motion respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("")
+    yield _MD_FOOTER
+
+
+def _write_rows(rows, out) -> None:
+    """Write rows to a file-like object separated by newlines (no trailing newline)."""
+    write = out.write
+    write(next(rows))
+    for row in rows:
+        write("\n")
+        write(row)
 
-    return "\n".join(lines)
+
+@profiling.span("format_ascii_box")
+def format_ascii_box(design_system: dict) -> str:
+    """Format design system as ASCII box with emojis (MCP-style)."""
+    return "\n".join(_box_rows(design_system))
+
+
+@profiling.span("write_ascii_box")
+def write_ascii_box(design_system: dict, out) -> None:
+    """Stream the ASCII box to a writer (anything with .write(str))."""
+    _write_rows(_box_rows(design_system), out)
+
+
+@profiling.span("format_markdown")
+def format_markdown(design_system: dict) -> str:
+    """Format design system as markdown."""
+    return "\n".join(_markdown_rows(design_system))
+
+
+@profiling.span("write_markdown")
+def write_markdown(design_system: dict, out) -> None:
+    """Stream the markdown document to a writer (anything with .write(str))."""
+    _write_rows(_markdown_rows(design_system), out)
 
 
 # ============ MAIN ENTRY POINT ============
+def _result_key(query: str, project_name: str, output_format: str) -> tuple:
+    """
+    Result cache key: (normalized query, header name, format).
+
+    Every search the generator runs tokenizes the query case- and
+    whitespace-insensitively, so only the header (which echoes the raw
+    query when no project name is given) depends on the original text.
+    """
+    output_format = "markdown" if output_format == "markdown" else "ascii"
+    return normalize_query(query), project_name or query.upper(), output_format
+
+
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii") -> str:
     """
     Main entry point for design system generation.
 
+    Results are cached per (normalized query, header name, format) and
+    dropped when any CSV under DATA_DIR changes; see result_cache.
+
     Args:
         query: Search query (e.g., "SaaS dashboard", "e-commerce luxury")
         project_name: Optional project name for output header
@@ -464,12 +607,89 @@ def generate_design_system(query: str, project_name: str = None, output_format:
     Returns:
         Formatted design system string
     """
+    key = _result_key(query, project_name, output_format)
+    cache = get_cache()
+    output = cache.get(key)
+    if output is not None:
+        return output
+
+    search_query, project_name, output_format = key
+    generator = DesignSystemGenerator()
+    design_system = generator.generate(search_query, project_name)
+
+    if output_format == "markdown":
+        output = format_markdown(design_system)
+    else:
+        output = format_ascii_box(design_system)
+    cache.put(key, output)
+    return output
+
+
+def write_design_system(query: str, out, project_name: str = None, output_format: str = "ascii") -> None:
+    """
+    Generate a design system and stream it to a writer.
+
+    A cached result is written as is; otherwise the output is streamed
+    without being cached.
+
+    Args:
+        query: Search query (e.g., "SaaS dashboard", "e-commerce luxury")
+        out: File-like object with .write(str)
+        project_name: Optional project name for output header
+        output_format: "ascii" (default) or "markdown"
+    """
+    key = _result_key(query, project_name, output_format)
+    cached = get_cache().get(key)
+    if cached is not None:
+        out.write(cached)
+        return
+
+    search_query, project_name, output_format = key
     generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    design_system = generator.generate(search_query, project_name)
 
     if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+        write_markdown(design_system, out)
+    else:
+        write_ascii_box(design_system, out)
+
+
+def _init_worker():
+    """Process pool initializer: load every index once per worker."""
+    enable_precompiled()
+    # Already inside a pool, so each worker builds its own indexes serially
+    warm_all(processes=1)
+
+
+def _generate_one(job: tuple) -> str:
+    query, project_name, output_format = job
+    return generate_design_system(query, project_name, output_format)
+
+
+def generate_many(queries: list, project_names: list = None, output_format: str = "ascii",
+                  processes: int = None) -> list:
+    """
+    Generate design systems for many queries across a process pool.
+
+    Args:
+        queries: Search queries, one design system each
+        project_names: Optional project names aligned with queries
+        output_format: "ascii" (default) or "markdown"
+        processes: Worker count (default: CPU count); 1 runs in-process
+
+    Returns:
+        Formatted design system strings, in input order
+    """
+    names = project_names or [None] * len(queries)
+    jobs = [(query, name, output_format) for query, name in zip(queries, names)]
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes <= 1:
+        return [_generate_one(job) for job in jobs]
+
+    # Imported here: it pulls in multiprocessing, which single queries never need
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        return list(pool.map(_generate_one, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
 
 
 # ============ CLI SUPPORT ============
@@ -483,5 +703,6 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    enable_precompiled()
     result = generate_design_system(args.query, args.project_name, args.format)
     print(result)
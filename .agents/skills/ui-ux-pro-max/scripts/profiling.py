@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profiling - opt-in timing spans and cache counters for the search and
+design-system pipeline.
+
+Usage:
+    python search.py "<query>" --profile              # report on stderr
+
+    import profiling
+    with profiling.profile(hook=print) as prof:       # hook(name, seconds) per span
+        generate_design_system("saas dashboard")
+    print(profiling.format_report(prof.report()))
+
+While disabled, a span costs one global lookup and a counter one call.
+"""
+
+import threading
+from functools import wraps
+from time import perf_counter
+
+
+# Profiler receiving spans and counters; None while profiling is disabled
+_active = None
+
+# name -> lru_cache-wrapped function whose hit/miss counts are reported
+_caches = {}
+
+
+class Profiler:
+    """Accumulates span timings and named counters (thread-safe)"""
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.spans = {}       # name -> [calls, total seconds, max seconds]
+        self.counters = {}    # name -> count
+        self._lock = threading.Lock()
+        self._cache_base = {name: fn.cache_info() for name, fn in _caches.items()}
+
+    def record(self, name, seconds):
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+                if seconds > span[2]:
+                    span[2] = seconds
+        if self.hook is not None:
+            self.hook(name, seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        """{"spans": {name: stats}, "counters": {name: count}} for this profiler's lifetime"""
+        with self._lock:
+            spans = {
+                name: {
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 4),
+                    "mean_ms": round(total * 1000 / calls, 4),
+                    "max_ms": round(peak * 1000, 4),
+                }
+                for name, (calls, total, peak) in self.spans.items()
+            }
+            counters = dict(self.counters)
+        # lru_cache statistics since this profiler was created
+        for name, fn in _caches.items():
+            info, base = fn.cache_info(), self._cache_base.get(name)
+            counters[f"{name}.hit"] = info.hits - (base.hits if base else 0)
+            counters[f"{name}.miss"] = info.misses - (base.misses if base else 0)
+        return {"spans": spans, "counters": dict(sorted(counters.items()))}
+
+
+def enable(hook=None):
+    """Start collecting into a new Profiler and return it"""
+    global _active
+    _active = Profiler(hook)
+    return _active
+
+
+def disable():
+    """Stop collecting; returns the Profiler that was active (or None)"""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+class profile:
+    """Context manager: profiling enabled for the duration of the block"""
+
+    def __init__(self, hook=None):
+        self.hook = hook
+
+    def __enter__(self):
+        return enable(self.hook)
+
+    def __exit__(self, *exc):
+        disable()
+        return False
+
+
+# ============ INSTRUMENTATION POINTS ============
+def span(name):
+    """Decorator timing every call of a function under ``name`` while profiling"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Increment a counter while profiling"""
+    profiler = _active
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def register_cache(name, cached_fn):
+    """Report hits/misses of a functools.lru_cache-wrapped function as counters"""
+    _caches[name] = cached_fn
+
+
+# ============ OUTPUT ============
+def format_report(report):
+    """Human-readable table of a Profiler.report()"""
+    lines = [f"{'span':<44} {'calls':>7} {'total ms':>10} {'mean ms':>10} {'max ms':>10}"]
+    for name, stats in sorted(report["spans"].items(), key=lambda item: item[1]["total_ms"], reverse=True):
+        lines.append(f"{name:<44} {stats['calls']:>7} {stats['total_ms']:>10.3f} "
+                     f"{stats['mean_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+    if report["counters"]:
+        lines.append("")
+        lines.append(f"{'counter':<44} {'count':>7}")
+        for name, value in report["counters"].items():
+            lines.append(f"{name:<44} {value:>7}")
+    return "\n".join(lines)
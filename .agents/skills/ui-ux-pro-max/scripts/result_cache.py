@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Result Cache - LRU + TTL cache of formatted design systems, invalidated
+whenever a CSV under DATA_DIR changes, optionally backed by an SQLite file so
+separate CLI invocations share results.
+
+Usage:
+    UI_PRO_MAX_RESULT_CACHE=~/.cache/ui-pro-max.sqlite python search.py "<query>" -ds
+
+    from result_cache import configure
+    configure(path="results.sqlite", max_entries=512, ttl=3600)
+
+Keys are (normalized query, project name, format); see normalize_query().
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import profiling
+from config import DATA_DIR
+
+
+# ============ CONFIGURATION ============
+RESULT_CACHE_SIZE = 256            # entries
+RESULT_CACHE_MAX_BYTES = 8 << 20   # total characters of cached output
+RESULT_CACHE_TTL = 3600.0          # seconds
+DATA_CHECK_INTERVAL = 1.0          # seconds between DATA_DIR change checks
+RESULT_CACHE_ENV = "UI_PRO_MAX_RESULT_CACHE"
+
+
+def normalize_query(query):
+    """Cache key form of a query: lowercase, whitespace collapsed.
+
+    Queries with the same normalized form tokenize identically, so they
+    produce the same search results.
+    """
+    return " ".join(str(query).lower().split())
+
+
+def data_signature(data_dir=None):
+    """(relative path, mtime_ns, size) of every CSV under DATA_DIR, sorted"""
+    data_dir = str(data_dir or DATA_DIR)
+    entries = []
+    pending = [data_dir]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".csv"):
+                        stat = entry.stat()
+                        entries.append((os.path.relpath(entry.path, data_dir), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            continue
+    return tuple(sorted(entries))
+
+
+# ============ STORES ============
+class _SqliteStore:
+    """On-disk entries shared between processes (one row per key).
+
+    Best effort: a locked or unwritable database behaves like a miss.
+    """
+
+    def __init__(self, path):
+        import sqlite3
+        self.Error = sqlite3.Error
+        self._conn = sqlite3.connect(str(path), timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, signature TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def get(self, key, signature, now, ttl):
+        """(value, age in seconds) of a fresh entry, or None"""
+        try:
+            row = self._conn.execute(
+                "SELECT value, signature, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_signature, created = row
+            if stored_signature != signature or now - created > ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        except self.Error:
+            return None
+        return value, max(0.0, now - created)
+
+    def put(self, key, value, signature, now, max_entries):
+        try:
+            self._put(key, value, signature, now, max_entries)
+        except self.Error:
+            pass
+
+    def _put(self, key, value, signature, now, max_entries):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (key, value, signature, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, value, signature, now, now),
+        )
+        # Rows from older data and least recently used rows beyond the limit go
+        self._conn.execute("DELETE FROM results WHERE signature != ?", (signature,))
+        self._conn.execute(
+            "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY accessed DESC LIMIT ?)",
+            (max_entries,),
+        )
+
+    def clear(self):
+        try:
+            self._conn.execute("DELETE FROM results")
+        except self.Error:
+            pass
+
+    def close(self):
+        self._conn.close()
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache of strings, dropped when DATA_DIR CSVs change.
+
+    Entries are evicted least recently used first once there are more than
+    ``max_entries`` of them or their total length exceeds ``max_bytes``.
+    With ``path``, misses fall through to an SQLite store that other
+    processes share.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL,
+                 max_bytes=RESULT_CACHE_MAX_BYTES, path=None, data_dir=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.data_dir = data_dir
+        self._entries = OrderedDict()   # key -> (value, created)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked = 0.0
+        self._store = _SqliteStore(path) if path else None
+
+    def _current_signature(self, now):
+        """DATA_DIR signature, rechecked at most every DATA_CHECK_INTERVAL; clears on change"""
+        if self._signature is None or now - self._checked >= DATA_CHECK_INTERVAL:
+            signature = repr(data_signature(self.data_dir))
+            if signature != self._signature:
+                self._entries.clear()
+                self._bytes = 0
+                self._signature = signature
+            self._checked = now
+        return self._signature
+
+    @staticmethod
+    def _key(key):
+        return "\x1f".join("" if part is None else str(part) for part in key)
+
+    def get(self, key):
+        """Cached value for a key tuple, or None"""
+        key = self._key(key)
+        now = time.monotonic()
+        with self._lock:
+            signature = self._current_signature(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    profiling.count("result_cache.hit")
+                    return value
+                self._remove(key)
+            if self._store is not None:
+                stored = self._store.get(key, signature, time.time(), self.ttl)
+                if stored is not None:
+                    value, age = stored
+                    # Keep the entry's original age so the TTL still counts from creation
+                    self._insert(key, value, now - age)
+                    profiling.count("result_cache.disk_hit")
+                    return value
+        profiling.count("result_cache.miss")
+        return None
+
+    def put(self, key, value):
+        key = self._key(key)
+        now = time.monotonic()
+        with self._lock:
+            signature = self._current_signature(now)
+            self._insert(key, value, now)
+            if self._store is not None:
+                self._store.put(key, value, signature, time.time(), self.max_entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._signature = None
+            if self._store is not None:
+                self._store.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _insert(self, key, value, created):
+        if key in self._entries:
+            self._remove(key)
+        if len(value) > self.max_bytes:
+            return
+        self._entries[key] = (value, created)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+# ============ PROCESS-WIDE CACHE ============
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide ResultCache (disk-backed if $UI_PRO_MAX_RESULT_CACHE is set)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = os.environ.get(RESULT_CACHE_ENV)
+                _cache = ResultCache(path=os.path.expanduser(path) if path else None)
+    return _cache
+
+
+def configure(**options):
+    """Replace the process-wide cache, e.g. configure(path=..., ttl=..., max_entries=...)"""
+    global _cache
+    with _cache_lock:
+        _cache = ResultCache(**options)
+    return _cache
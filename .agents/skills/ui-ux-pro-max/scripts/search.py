@@ -1,76 +1,202 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
-       python search.py "<query>" --design-system [-p "Project Name"]
-
-Domains: style, prompt, color, chart, landing, product, ux, typography
-Stacks: html-tailwind, react, nextjs
-"""
-
-import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system
-
-
-def format_output(result):
-    """Format results for Claude consumption (token-optimized)"""
-    if "error" in result:
-        return f"Error: {result['error']}"
-
-    output = []
-    if result.get("stack"):
-        output.append(f"## UI Pro Max Stack Guidelines")
-        output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
-    else:
-        output.append(f"## UI Pro Max Search Results")
-        output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
-
-    for i, row in enumerate(result['results'], 1):
-        output.append(f"### Result {i}")
-        for key, value in row.items():
-            value_str = str(value)
-            if len(value_str) > 300:
-                value_str = value_str[:300] + "..."
-            output.append(f"- **{key}:** {value_str}")
-        output.append("")
-
-    return "\n".join(output)
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
-    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
-    parser.add_argument("--json", action="store_true", help="Output as JSON")
-    # Design system generation
-    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
-    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
-
-    args = parser.parse_args()
-
-    # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(args.query, args.project_name, args.format)
-        print(result)
-    # Stack search
-    elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
-    # Domain search
-    else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --design-system [-p "Project Name"]
+       python search.py --batch queries.jsonl [--domain <domain>]   (use "-" for stdin)
+       python search.py --build-index [--jobs 4]   (per-file timings; indexes built in parallel)
+       python search.py --memory     (row storage size per corpus)
+       python search.py "<query>" --profile   (timings and cache counters on stderr)
+       python search.py --serve      (later calls are answered by the daemon while it runs)
+
+Set UI_PRO_MAX_RESULT_CACHE=<file.sqlite> to share --design-system results between runs.
+
+Domains: style, prompt, color, chart, landing, product, ux, typography
+Stacks: html-tailwind, react, nextjs
+"""
+
+import argparse
+import sys
+# Only the config tables at import time; each mode below imports what it needs
+# (core for in-process search, design_system for -ds, daemon for thin clients)
+from config import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS
+
+
+def format_output(result):
+    """Format results for Claude consumption (token-optimized)"""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    output = []
+    if result.get("stack"):
+        output.append(f"## UI Pro Max Stack Guidelines")
+        output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
+    else:
+        output.append(f"## UI Pro Max Search Results")
+        output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
+    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+
+    for i, row in enumerate(result['results'], 1):
+        output.append(f"### Result {i}")
+        for key, value in row.items():
+            value_str = str(value)
+            if len(value_str) > 300:
+                value_str = value_str[:300] + "..."
+            output.append(f"- **{key}:** {value_str}")
+        output.append("")
+
+    return "\n".join(output)
+
+
+BATCH_SIZE = 1000
+
+
+def _read_batch_queries(stream):
+    """Yield (line number, query, error) from JSONL: one JSON string or {"query": ...} per line.
+
+    A line that isn't valid JSON, or whose query isn't a string (null, a
+    number, a missing "query" key...), gives query None and an error message
+    instead of ending the batch.
+    """
+    import json
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"line {line_no}: invalid JSON ({e})"
+            continue
+        if isinstance(item, dict):
+            if "query" not in item:
+                yield line_no, None, f'line {line_no}: missing "query" key'
+                continue
+            item = item["query"]
+        if not isinstance(item, str):
+            yield line_no, None, f"line {line_no}: query must be a string, got {json.dumps(item)}"
+            continue
+        yield line_no, item, None
+
+
+def _write_batch(chunk, out, domain, max_results):
+    import json
+    from core import search_many
+    results = iter(search_many([query for _, query, error in chunk if error is None], domain, max_results))
+    for line_no, query, error in chunk:
+        result = {"error": error, "line": line_no} if error is not None else next(results)
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def run_batch(stream, out, domain=None, max_results=MAX_RESULTS):
+    """Stream JSONL queries through search_many(), writing one JSON result per input line"""
+    chunk = []
+    for entry in _read_batch_queries(stream):
+        chunk.append(entry)
+        if len(chunk) >= BATCH_SIZE:
+            _write_batch(chunk, out, domain, max_results)
+            chunk = []
+    if chunk:
+        _write_batch(chunk, out, domain, max_results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Search")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
+    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--batch", metavar="FILE", help="Batch mode: JSONL queries from FILE ('-' for stdin), JSONL results to stdout")
+    parser.add_argument("--build-index", action="store_true", help="Precompile all domain/stack indexes into data/search-index.bin")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Index build processes for --build-index/--serve (default: CPU count)")
+    parser.add_argument("--memory", action="store_true", help="Report row storage size per corpus (dict rows vs column store)")
+    # Search daemon
+    parser.add_argument("--serve", action="store_true", help="Run a search daemon that keeps all indexes in memory")
+    parser.add_argument("--port", type=int, default=None, help="Daemon port on 127.0.0.1 (default: $UI_PRO_MAX_PORT or 7654)")
+    parser.add_argument("--no-daemon", action="store_true", help="Always search in-process, even if a daemon is running")
+    parser.add_argument("--profile", action="store_true", help="Print span timings and cache counters to stderr (searches in-process)")
+    # Design system generation
+    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
+    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
+    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+
+    args = parser.parse_args()
+
+    if args.profile:
+        import atexit
+        import profiling
+        profiler = profiling.enable()
+        atexit.register(lambda: print(profiling.format_report(profiler.report()), file=sys.stderr))
+
+    if args.build_index:
+        from binary_index import INDEX_FILE, build_index_file
+        report = build_index_file(processes=args.jobs)
+        for rel_file, n_docs, n_terms, seconds, how in report:
+            print(f"{rel_file}: {n_docs} rows, {n_terms} terms, {seconds * 1000:.1f} ms ({how})")
+        print(f"Wrote {INDEX_FILE} ({sum(entry[3] for entry in report) * 1000:.1f} ms indexing)")
+        sys.exit(0)
+
+    if args.memory:
+        from core import memory_report
+        total_dict = total_store = 0
+        for rel_file, n_rows, dict_bytes, store_bytes in memory_report():
+            print(f"{rel_file:<28} {n_rows:>5} rows  dicts {dict_bytes / 1024:8.1f} KiB  columns {store_bytes / 1024:8.1f} KiB")
+            total_dict += dict_bytes
+            total_store += store_bytes
+        print(f"{'total':<28} {'':>10}  dicts {total_dict / 1024:8.1f} KiB  columns {total_store / 1024:8.1f} KiB")
+        sys.exit(0)
+
+    if args.serve:
+        from daemon import DEFAULT_PORT, serve
+        serve(port=args.port or DEFAULT_PORT, processes=args.jobs)
+        sys.exit(0)
+
+    if args.batch:
+        if args.stack or args.design_system:
+            parser.error("--batch only supports domain search")
+        from core import enable_precompiled
+        enable_precompiled()
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.domain, args.max_results)
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                run_batch(f, sys.stdout, args.domain, args.max_results)
+        sys.exit(0)
+
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
+    # Design system takes priority, then stack search, then domain search
+    if args.design_system:
+        payload = {"op": "design_system", "query": args.query, "project_name": args.project_name, "format": args.format}
+    elif args.stack:
+        payload = {"op": "search_stack", "query": args.query, "stack": args.stack, "max_results": args.max_results}
+    else:
+        payload = {"op": "search", "query": args.query, "domain": args.domain, "max_results": args.max_results}
+
+    # Ask a running daemon first; fall back to searching in-process
+    result = None
+    if not args.no_daemon and not args.profile:
+        from daemon import DEFAULT_PORT, request
+        result = request(payload, port=args.port or DEFAULT_PORT)
+    if result is None:
+        from core import enable_precompiled, search, search_stack
+        # Use the precompiled index when present; stale sections fall back to the CSVs
+        enable_precompiled()
+        if args.design_system:
+            from design_system import generate_design_system
+            result = {"output": generate_design_system(args.query, args.project_name, args.format)}
+        elif args.stack:
+            result = search_stack(args.query, args.stack, args.max_results)
+        else:
+            result = search(args.query, args.domain, args.max_results)
+
+    if args.design_system:
+        print(result["output"] if "output" in result else f"Error: {result.get('error')}")
+    elif args.json:
+        import json
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(format_output(result))
@@ -0,0 +1,189 @@
+"""Budgeting method engine: NWS, Kakeibo and STOP allocations.
+
+The splits match the method pages in src/components (NWSMethod.tsx,
+KakeiboMethod.tsx, STOPMethod.tsx). A FinancialData snapshot is evaluated
+against them:
+
+- income is split into buckets by the method's percentages (the targets);
+- each expense category is assigned to a bucket by keywords in its name,
+  and savings plus all investments go to the method's reserve bucket (the
+  actuals, in the same period as income);
+- variance = actual - target, and buckets off target by more than
+  RECOMMENDATION_TOLERANCE of income get a recommendation.
+
+evaluate_batch() evaluates many snapshots at once as matrix arithmetic:
+numpy when it is installed, plain Python lists otherwise.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional
+import re
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python path gives the same results, slower
+    np = None
+
+RECOMMENDATION_TOLERANCE = 0.01   # fraction of income
+
+
+class Bucket:
+    """One slice of a method: ``kind`` is "limit" (spend at most the target)
+    or "goal" (put aside at least the target)"""
+
+    def __init__(self, name: str, percentage: float, kind: str, keywords: str = ""):
+        self.name = name
+        self.percentage = percentage
+        self.kind = kind
+        self.keywords = frozenset(keywords.split())
+
+
+class Method:
+    def __init__(self, method_id: str, name: str, buckets: List[Bucket], default: str, reserve: str,
+                 remainder: Optional[str] = None):
+        self.id = method_id
+        self.name = name
+        self.buckets = buckets
+        self.names = [bucket.name for bucket in buckets]
+        self.default = self.names.index(default)       # bucket for unmatched expense categories
+        self.reserve = self.names.index(reserve)       # bucket for savings and investments
+        # Bucket whose actual is whatever income is left over (STOP's profit)
+        self.remainder = self.names.index(remainder) if remainder else None
+
+    def bucket_index(self, category: str) -> int:
+        return _classify(self.id, category)
+
+
+# ============ METHODS ============
+_ESSENTIALS = ("housing rent mortgage utilities utility electricity water gas internet phone "
+               "groceries grocery food transportation transport car fuel commute insurance childcare "
+               "debt loan loans tax taxes")
+_LEISURE = "entertainment travel vacation shopping clothing dining restaurants takeout subscriptions hobbies"
+_RESERVES = "savings saving emergency retirement investment investments"
+
+METHODS: Dict[str, Method] = {
+    "nws": Method("nws", "NWS", [
+        Bucket("Necessities", 50, "limit", _ESSENTIALS + " healthcare health medical"),
+        Bucket("Wants", 30, "limit", _LEISURE),
+        Bucket("Savings", 20, "goal", _RESERVES),
+    ], default="Wants", reserve="Savings"),
+    "kakeibo": Method("kakeibo", "Kakeibo", [
+        Bucket("Needs", 50, "limit", _ESSENTIALS),
+        Bucket("Wants", 20, "limit", _LEISURE),
+        Bucket("Culture", 20, "limit", "culture education books events courses tuition learning museum"),
+        Bucket("Unexpected", 10, "goal", _RESERVES + " healthcare health medical repairs repair maintenance"),
+    ], default="Wants", reserve="Unexpected"),
+    "stop": Method("stop", "STOP", [
+        Bucket("Savings", 25, "goal", _RESERVES),
+        Bucket("Taxes", 30, "goal", "tax taxes"),
+        Bucket("Operations", 35, "limit"),
+        Bucket("Profit", 10, "goal"),
+    ], default="Operations", reserve="Savings", remainder="Profit"),
+}
+
+
+@lru_cache(maxsize=4096)
+def _classify(method_id: str, category: str) -> int:
+    words = set(re.split(r"[^a-z0-9]+", category.lower()))
+    method = METHODS[method_id]
+    for i, bucket in enumerate(method.buckets):
+        if words & bucket.keywords:
+            return i
+    return method.default
+
+
+# ============ ARITHMETIC ============
+def _numpy_totals(method: Method, income, expenses, reserves, columns):
+    income = np.asarray(income, dtype=float)
+    expenses = np.asarray(expenses, dtype=float).reshape(len(income), len(columns))
+    reserves = np.asarray(reserves, dtype=float)
+    # One-hot category -> bucket matrix: a single product sums every bucket
+    assign = np.zeros((len(columns), len(method.buckets)))
+    assign[np.arange(len(columns)), [method.bucket_index(c) for c in columns]] = 1.0
+    actual = expenses @ assign
+    actual[:, method.reserve] += reserves
+    unallocated = income - expenses.sum(axis=1) - reserves
+    if method.remainder is not None:
+        actual[:, method.remainder] += unallocated
+    targets = np.outer(income, [bucket.percentage / 100 for bucket in method.buckets])
+    return targets.tolist(), actual.tolist(), (actual - targets).tolist(), unallocated.tolist()
+
+
+def _python_totals(method: Method, income, expenses, reserves, columns):
+    indexes = [method.bucket_index(c) for c in columns]
+    fractions = [bucket.percentage / 100 for bucket in method.buckets]
+    targets, actual, variance, unallocated = [], [], [], []
+    for user_income, row, reserve in zip(income, expenses, reserves):
+        totals = [0.0] * len(fractions)
+        for i, amount in zip(indexes, row):
+            totals[i] += amount
+        totals[method.reserve] += reserve
+        left = user_income - sum(row) - reserve
+        if method.remainder is not None:
+            totals[method.remainder] += left
+        user_targets = [user_income * f for f in fractions]
+        targets.append(user_targets)
+        actual.append(totals)
+        variance.append([a - t for a, t in zip(totals, user_targets)])
+        unallocated.append(left)
+    return targets, actual, variance, unallocated
+
+
+# ============ EVALUATION ============
+def _recommendations(method: Method, income: float, actual: List[float], variance: List[float],
+                     unallocated: float) -> List[str]:
+    tips = []
+    if unallocated < 0:
+        tips.append(f"Spending and savings exceed income by ${-unallocated:,.2f}")
+    tolerance = abs(income) * RECOMMENDATION_TOLERANCE
+    for bucket, amount, delta in zip(method.buckets, actual, variance):
+        target = amount - delta
+        if bucket.kind == "limit" and delta > tolerance:
+            tips.append(f"{bucket.name} is ${delta:,.2f} over its {bucket.percentage:g}% target; "
+                        f"bring it down to ${target:,.2f}")
+        elif bucket.kind == "goal" and -delta > tolerance:
+            tips.append(f"{bucket.name} is ${-delta:,.2f} short of its {bucket.percentage:g}% target "
+                        f"of ${target:,.2f}")
+    if not tips:
+        tips.append(f"Within every {method.name} target")
+    return tips
+
+
+def evaluate_batch(method_id: str, snapshots: List[dict]) -> List[dict]:
+    """Evaluate one method for many FinancialData dicts; raises KeyError for unknown methods"""
+    method = METHODS[method_id]
+    columns = sorted({name for snapshot in snapshots for name in snapshot["expenses"]})
+    income = [snapshot["income"] for snapshot in snapshots]
+    expenses = [[snapshot["expenses"].get(name, 0.0) for name in columns] for snapshot in snapshots]
+    reserves = [snapshot["savings"] + sum(snapshot["investments"].values()) for snapshot in snapshots]
+
+    totals = _numpy_totals if np is not None else _python_totals
+    targets, actual, variance, unallocated = totals(method, income, expenses, reserves, columns)
+
+    results = []
+    for i, snapshot in enumerate(snapshots):
+        results.append({
+            "method": method.id,
+            "user_id": snapshot["user_id"],
+            "income": snapshot["income"],
+            "allocation": [
+                {
+                    "name": bucket.name,
+                    "percentage": bucket.percentage,
+                    "kind": bucket.kind,
+                    "target": round(targets[i][j], 2),
+                    "actual": round(actual[i][j], 2),
+                    "variance": round(variance[i][j], 2),
+                }
+                for j, bucket in enumerate(method.buckets)
+            ],
+            "unallocated": round(unallocated[i], 2),
+            "recommendations": _recommendations(method, snapshot["income"], actual[i], variance[i],
+                                                unallocated[i]),
+        })
+    return results
+
+
+def evaluate(method_id: str, snapshot: dict) -> dict:
+    """Evaluate one FinancialData dict with one method"""
+    return evaluate_batch(method_id, [snapshot])[0]
@@ -0,0 +1,426 @@
+"""Storage backends for the FinPercent API.
+
+Routes talk to a repository through async methods, so the backing store can
+change without touching them:
+
+- MemoryRepository keeps everything in process (tests, single-worker dev).
+- SqliteRepository persists to one SQLite file in WAL mode, so several
+  uvicorn workers can share it without an outside database service.
+
+Financial data is an append-only history per user: every snapshot is kept,
+numbered by ``seq`` in arrival order, and stamped with a ``timestamp`` that
+never decreases, so seq order is time order. Range reads binary-search the
+timestamps and page with the seq of the next record as cursor.
+
+create_repository() picks one from $FINPERCENT_DB: "memory", or a path to
+the SQLite file (default: backend/finpercent.db).
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Tuple
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import threading
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "finpercent.db")
+DB_POOL_SIZE = 4
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGE_SIZE = 1000
+
+
+class DuplicateUserError(ValueError):
+    def __init__(self, field: str):
+        super().__init__(f"{field.capitalize()} already registered")
+        self.field = field
+
+
+def _email_key(email: str) -> str:
+    return email.strip().lower()
+
+
+def _next_timestamp(last: Optional[float]) -> float:
+    # Clamped so a clock stepping back can't unsort the time index
+    now = datetime.now().timestamp()
+    return now if last is None else max(now, last)
+
+
+def _stamp(record: dict, seq: int, timestamp: float) -> dict:
+    record["seq"] = seq
+    record["timestamp"] = timestamp
+    record["created_at"] = datetime.fromtimestamp(timestamp).isoformat()
+    return record
+
+
+# ============ IN-MEMORY BACKEND ============
+class UserStore:
+    """Users by id, with a unique username index and an email index kept in
+    step on insert. Emails need not be unique; get_by_email() returns the
+    first user registered with one (case-insensitive)."""
+
+    def __init__(self):
+        self._users = {}
+        self._by_username = {}
+        self._by_email = {}
+        self._lock = threading.Lock()
+
+    def check_available(self, username: str):
+        if username in self._by_username:
+            raise DuplicateUserError("username")
+
+    def add(self, user: dict):
+        with self._lock:
+            self.check_available(user["username"])
+            self._users[user["id"]] = user
+            self._by_username[user["username"]] = user["id"]
+            self._by_email.setdefault(_email_key(user["email"]), user["id"])
+
+    def get_by_username(self, username: str) -> Optional[dict]:
+        user_id = self._by_username.get(username)
+        return self._users[user_id] if user_id is not None else None
+
+    def get_by_email(self, email: str) -> Optional[dict]:
+        user_id = self._by_email.get(_email_key(email))
+        return self._users[user_id] if user_id is not None else None
+
+    def get(self, user_id: str) -> Optional[dict]:
+        return self._users.get(user_id)
+
+    def __getitem__(self, user_id: str) -> dict:
+        return self._users[user_id]
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._users
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+class FinancialHistory:
+    """One user's snapshots in columns: array('d') per numeric field.
+
+    Expense and investment maps get one column per category, holding NaN for
+    snapshots without that category, so amounts must be finite (append()
+    raises ValueError otherwise). ``timestamps`` is sorted, so time ranges
+    are two bisects; a record is rebuilt only when it is returned.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.timestamps = array("d")
+        self.income = array("d")
+        self.savings = array("d")
+        self.expenses = {}
+        self.investments = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _append_map(columns: dict, values: dict, n: int):
+        for name, column in columns.items():
+            column.append(values.get(name, math.nan))
+        for name, value in values.items():
+            if name not in columns:
+                column = columns[name] = array("d", [math.nan]) * n
+                column.append(value)
+
+    def append(self, record: dict) -> dict:
+        amounts = [record["income"], record["savings"], *record["expenses"].values(),
+                   *record["investments"].values()]
+        if not all(math.isfinite(amount) for amount in amounts):
+            raise ValueError("Financial amounts must be finite")
+        n = len(self.ids)
+        _stamp(record, n, _next_timestamp(self.timestamps[-1] if n else None))
+        self.ids.append(record["id"])
+        self.timestamps.append(record["timestamp"])
+        self.income.append(record["income"])
+        self.savings.append(record["savings"])
+        self._append_map(self.expenses, record["expenses"], n)
+        self._append_map(self.investments, record["investments"], n)
+        return record
+
+    def record(self, user_id: str, i: int) -> dict:
+        return _stamp({
+            "id": self.ids[i],
+            "user_id": user_id,
+            "income": self.income[i],
+            "expenses": {name: col[i] for name, col in self.expenses.items() if not math.isnan(col[i])},
+            "savings": self.savings[i],
+            "investments": {name: col[i] for name, col in self.investments.items() if not math.isnan(col[i])},
+        }, i, self.timestamps[i])
+
+    def bounds(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """Index range of snapshots with start <= timestamp <= end"""
+        lo = bisect_left(self.timestamps, start) if start is not None else 0
+        hi = bisect_right(self.timestamps, end) if end is not None else len(self.ids)
+        return lo, hi
+
+
+class MemoryRepository:
+    """Process-local storage; contents are lost on restart"""
+
+    def __init__(self):
+        self.users = UserStore()
+        self.financial_data = {}   # user_id -> FinancialHistory
+
+    async def check_available(self, username: str):
+        self.users.check_available(username)
+
+    async def add_user(self, user: dict):
+        self.users.add(user)
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        return self.users.get(user_id)
+
+    async def get_user_by_username(self, username: str) -> Optional[dict]:
+        return self.users.get_by_username(username)
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return self.users.get_by_email(email)
+
+    async def put_financial_data(self, record: dict) -> dict:
+        history = self.financial_data.get(record["user_id"])
+        if history is None:
+            history = self.financial_data[record["user_id"]] = FinancialHistory()
+        return history.append(record)
+
+    async def get_financial_data(self, user_id: str) -> Optional[dict]:
+        history = self.financial_data.get(user_id)
+        return history.record(user_id, len(history) - 1) if history else None
+
+    async def get_financial_history(self, user_id: str, start: Optional[float] = None,
+                                    end: Optional[float] = None, cursor: int = 0,
+                                    limit: int = HISTORY_PAGE_SIZE) -> Tuple[list, Optional[int]]:
+        history = self.financial_data.get(user_id)
+        if history is None:
+            return [], None
+        lo, hi = history.bounds(start, end)
+        lo = max(lo, cursor)
+        stop = min(hi, lo + limit)
+        return [history.record(user_id, i) for i in range(lo, stop)], (stop if stop < hi else None)
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+# ============ SQLITE BACKEND ============
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL,
+    email_key TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_email ON users (email_key);
+CREATE TABLE IF NOT EXISTS financial_history (
+    user_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    id TEXT NOT NULL,
+    income REAL NOT NULL,
+    expenses TEXT NOT NULL,
+    savings REAL NOT NULL,
+    investments TEXT NOT NULL,
+    PRIMARY KEY (user_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS financial_history_time ON financial_history (user_id, timestamp);
+"""
+
+# Statements are fixed strings with parameters, so each pooled connection
+# prepares them once and reuses them from its statement cache
+_INSERT_USER = ("INSERT INTO users (id, username, email, email_key, password_hash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+_USER_COLUMNS = "SELECT id, username, email, password_hash, created_at FROM users"
+_SELECT_USER = _USER_COLUMNS + " WHERE id = ?"
+_SELECT_USER_BY_USERNAME = _USER_COLUMNS + " WHERE username = ?"
+_SELECT_USER_BY_EMAIL = _USER_COLUMNS + " WHERE email_key = ? ORDER BY rowid LIMIT 1"
+_SELECT_TAKEN = "SELECT EXISTS(SELECT 1 FROM users WHERE username = ?)"
+# seq and timestamp come from the user's latest row in the same statement,
+# so concurrent appends from several workers still number consecutively
+_APPEND_FINANCIAL_DATA = ("INSERT INTO financial_history "
+                          "(user_id, seq, timestamp, id, income, expenses, savings, investments) "
+                          "SELECT ?1, COALESCE(MAX(seq) + 1, 0), MAX(?2, COALESCE(MAX(timestamp), ?2)), "
+                          "?3, ?4, ?5, ?6, ?7 FROM financial_history WHERE user_id = ?1 "
+                          "RETURNING seq, timestamp")
+_FINANCIAL_COLUMNS = ("SELECT id, user_id, income, expenses, savings, investments, seq, timestamp "
+                      "FROM financial_history")
+_SELECT_FINANCIAL_DATA = _FINANCIAL_COLUMNS + " WHERE user_id = ? ORDER BY seq DESC LIMIT 1"
+# Served by the (user_id, timestamp) index; one row past the page tells
+# whether another page follows
+_SELECT_FINANCIAL_HISTORY = (_FINANCIAL_COLUMNS + " WHERE user_id = ? AND timestamp >= ? AND timestamp <= ? "
+                             "AND seq >= ? ORDER BY seq LIMIT ?")
+
+
+class ConnectionPool:
+    """SQLite connections shared by asyncio code.
+
+    Each of ``size`` worker threads owns one connection, opened on first
+    use; run() executes a function with a connection on one of those
+    threads, so queries never block the event loop and at most ``size``
+    run at once. After close() the next run() starts a fresh pool.
+    """
+
+    def __init__(self, path: str, size: int = DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._executor = None
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                               check_same_thread=False, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        # WAL: readers never wait for the writer; NORMAL sync is durable in WAL mode
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._connections:
+                conn.executescript(SCHEMA)
+            self._connections.append(conn)
+        return conn
+
+    def _call(self, fn, args):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return fn(conn, *args)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="sqlite")
+            return self._executor
+
+    async def run(self, fn, *args):
+        """fn(connection, *args) on a pooled connection"""
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), self._call, fn, args)
+
+    async def open(self):
+        """Open every connection now rather than on the first requests"""
+        barrier = threading.Barrier(self.size)
+        # Each call holds its thread until all have started, so every
+        # thread gets (and opens) its connection
+        await asyncio.gather(*(self.run(_wait, barrier) for _ in range(self.size)))
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            # Threads of the old executor are gone; new ones open new connections
+            self._local = threading.local()
+
+
+def _wait(conn, barrier):
+    barrier.wait(timeout=30)
+
+
+def _user_from_row(row) -> Optional[dict]:
+    return dict(row) if row is not None else None
+
+
+def _financial_data_from_row(row) -> Optional[dict]:
+    if row is None:
+        return None
+    record = dict(row)
+    record["expenses"] = json.loads(record["expenses"])
+    record["investments"] = json.loads(record["investments"])
+    return _stamp(record, record["seq"], record["timestamp"])
+
+
+def _check_available(conn, username):
+    if conn.execute(_SELECT_TAKEN, (username,)).fetchone()[0]:
+        raise DuplicateUserError("username")
+
+
+def _add_user(conn, user):
+    try:
+        conn.execute(_INSERT_USER, (user["id"], user["username"], user["email"], _email_key(user["email"]),
+                                    user["password_hash"], user["created_at"]))
+    except sqlite3.IntegrityError as e:
+        # Another request took the name between the check and the insert
+        raise DuplicateUserError("username") from e
+
+
+def _fetch_one(conn, sql, param):
+    return conn.execute(sql, (param,)).fetchone()
+
+
+def _append_financial_data(conn, record):
+    return conn.execute(_APPEND_FINANCIAL_DATA, (
+        record["user_id"], datetime.now().timestamp(), record["id"], record["income"],
+        json.dumps(record["expenses"]), record["savings"], json.dumps(record["investments"]),
+    )).fetchone()
+
+
+def _financial_history(conn, user_id, start, end, cursor, limit):
+    return conn.execute(_SELECT_FINANCIAL_HISTORY, (
+        user_id, -math.inf if start is None else start, math.inf if end is None else end, cursor, limit + 1,
+    )).fetchall()
+
+
+class SqliteRepository:
+    """Storage in one SQLite file shared by every worker process"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, pool_size: int = DB_POOL_SIZE):
+        self.pool = ConnectionPool(path, pool_size)
+
+    async def check_available(self, username: str):
+        await self.pool.run(_check_available, username)
+
+    async def add_user(self, user: dict):
+        await self.pool.run(_add_user, user)
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        return _user_from_row(await self.pool.run(_fetch_one, _SELECT_USER, user_id))
+
+    async def get_user_by_username(self, username: str) -> Optional[dict]:
+        return _user_from_row(await self.pool.run(_fetch_one, _SELECT_USER_BY_USERNAME, username))
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return _user_from_row(await self.pool.run(_fetch_one, _SELECT_USER_BY_EMAIL, _email_key(email)))
+
+    async def put_financial_data(self, record: dict) -> dict:
+        seq, timestamp = await self.pool.run(_append_financial_data, record)
+        return _stamp(record, seq, timestamp)
+
+    async def get_financial_data(self, user_id: str) -> Optional[dict]:
+        return _financial_data_from_row(await self.pool.run(_fetch_one, _SELECT_FINANCIAL_DATA, user_id))
+
+    async def get_financial_history(self, user_id: str, start: Optional[float] = None,
+                                    end: Optional[float] = None, cursor: int = 0,
+                                    limit: int = HISTORY_PAGE_SIZE) -> Tuple[list, Optional[int]]:
+        rows = await self.pool.run(_financial_history, user_id, start, end, cursor, limit)
+        records = [_financial_data_from_row(row) for row in rows[:limit]]
+        return records, (rows[limit]["seq"] if len(rows) > limit else None)
+
+    async def open(self):
+        await self.pool.open()
+
+    async def close(self):
+        self.pool.close()
+
+
+def create_repository(target: Optional[str] = None):
+    """Repository for $FINPERCENT_DB (or ``target``): "memory" or an SQLite file path"""
+    target = target or os.environ.get("FINPERCENT_DB") or DEFAULT_DB_PATH
+    if target == "memory":
+        return MemoryRepository()
+    return SqliteRepository(target)
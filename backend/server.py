@@ -1,25 +1,89 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Optional
 import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+import hashlib
+import hmac
+import math
 import os
+import secrets
 
-app = FastAPI(title="FinPercent API", version="1.0.0")
+try:
+    from backend import budgeting
+    from backend.repository import (DuplicateUserError, HISTORY_MAX_PAGE_SIZE, HISTORY_PAGE_SIZE,
+                                    create_repository)
+except ImportError:  # run as a script: python3 backend/server.py
+    import budgeting
+    from repository import DuplicateUserError, HISTORY_MAX_PAGE_SIZE, HISTORY_PAGE_SIZE, create_repository
+
+# Password hashing: scrypt, or PBKDF2-SHA256 where OpenSSL lacks scrypt.
+# A hash takes tens of milliseconds of CPU, so it runs in its own thread pool
+# (hashlib releases the GIL) instead of blocking the event loop.
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+PBKDF2_ITERATIONS = 600_000
+_hash_executor = None
+
+
+def hash_password(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    if hasattr(hashlib, "scrypt"):
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    scheme, *params = encoded.split("$")
+    if scheme == "scrypt":
+        n, r, p, salt, expected = params
+        digest = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=int(n), r=int(r), p=int(p),
+                                dklen=len(expected) // 2)
+    elif scheme == "pbkdf2_sha256":
+        iterations, salt, expected = params
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    else:
+        return False
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return hash_password(secrets.token_hex(16))
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# In-memory storage (for testing purposes)
-users_db = {}
-financial_data_db = {}
+def check_credentials(user: Optional[dict], password: str) -> bool:
+    # Unknown usernames are checked against a dummy hash so they take as
+    # long to reject as wrong passwords
+    encoded = user["password_hash"] if user else _dummy_hash()
+    return verify_password(password, encoded) and user is not None
+
+
+async def _in_hash_pool(fn, *args):
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+
+
+def _close_hash_pool():
+    global _hash_executor
+    executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+# Users and financial data: SQLite file by default, FINPERCENT_DB=memory for tests
+repository = create_repository()
 methods_db = [
     {"id": "nws", "name": "NWS", "description": "Needs, Wants, Savings method"},
     {"id": "kakeibo", "name": "Kakeibo", "description": "Japanese budgeting method"},
@@ -31,6 +95,67 @@ features_db = [
     {"id": "debt-repayment", "name": "Debt Repayment", "status": "available"}
 ]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup (once per worker): open the storage connections and compute the
+    # dummy password hash so the first requests don't pay for either
+    await repository.open()
+    await _in_hash_pool(_dummy_hash)
+    yield
+    # Shutdown: close storage connections and stop the hashing threads
+    await repository.close()
+    _close_hash_pool()
+
+app = FastAPI(title="FinPercent API", version="1.0.0", lifespan=lifespan)
+
+
+class WorkerIdMiddleware:
+    """Adds an X-Worker-PID header so clients can tell which worker answered"""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = (b"x-worker-pid", str(os.getpid()).encode())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_pid(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append(self.header)
+            await send(message)
+
+        await self.app(scope, receive, send_with_pid)
+
+app.add_middleware(WorkerIdMiddleware)
+
+
+def _json_safe(value):
+    """value with NaN and infinities replaced by None, so it can be sent as JSON"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    return value
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    # The default handler echoes the rejected input, which fails to encode
+    # when it is the NaN or infinity that was rejected
+    return JSONResponse(status_code=422, content={"detail": _json_safe(jsonable_encoder(exc.errors()))})
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
 # Pydantic models
 class User(BaseModel):
     username: str
@@ -46,12 +171,22 @@ class LoginRequest(BaseModel):
     username: str
     password: str
 
+# NaN and infinity are rejected: they can't be returned as JSON, and the
+# stored history uses NaN to mark a category a snapshot doesn't have
+Amount = Annotated[float, Field(allow_inf_nan=False)]
+
 class FinancialData(BaseModel):
     user_id: str
-    income: float
-    expenses: Dict[str, float]
-    savings: float
-    investments: Dict[str, float]
+    income: Amount
+    expenses: Dict[str, Amount]
+    savings: Amount
+    investments: Dict[str, Amount]
+
+class BatchEvaluationRequest(BaseModel):
+    # Snapshots to evaluate, and/or users whose latest stored snapshot is used
+    items: List[FinancialData] = []
+    user_ids: List[str] = []
+    methods: Optional[List[str]] = None
 
 # Routes
 @app.get("/api/health")
@@ -60,26 +195,26 @@ async def health_check():
 
 @app.post("/api/users", response_model=UserResponse, status_code=201)
 async def create_user(user: User):
-    user_id = str(uuid.uuid4())
-    users_db[user_id] = {
-        "id": user_id,
-        "username": user.username,
-        "email": user.email,
-        "password": user.password,  # In real app, hash this
-        "created_at": datetime.now().isoformat()
-    }
+    try:
+        # Fail fast before paying for the hash; add() checks again atomically
+        await repository.check_available(user.username)
+        password_hash = await _in_hash_pool(hash_password, user.password)
+        user_id = str(uuid.uuid4())
+        await repository.add_user({
+            "id": user_id,
+            "username": user.username,
+            "email": user.email,
+            "password_hash": password_hash,
+            "created_at": datetime.now().isoformat()
+        })
+    except DuplicateUserError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     return UserResponse(id=user_id, username=user.username, email=user.email)
 
 @app.post("/api/login")
 async def login(login_request: LoginRequest):
-    # Find user by username
-    user = None
-    for uid, user_data in users_db.items():
-        if user_data["username"] == login_request.username:
-            user = user_data
-            break
-    
-    if not user or user["password"] != login_request.password:
+    user = await repository.get_user_by_username(login_request.username)
+    if not await _in_hash_pool(check_credentials, user, login_request.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # In real app, generate JWT token
@@ -100,6 +235,37 @@ async def get_method(method_id: str):
         raise HTTPException(status_code=404, detail="Method not found")
     return method
 
+@app.post("/api/methods/evaluate")
+async def evaluate_methods_batch(request: BatchEvaluationRequest):
+    method_ids = request.methods if request.methods is not None else list(budgeting.METHODS)
+    unknown = [m for m in method_ids if m not in budgeting.METHODS]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Method not found: {', '.join(unknown)}")
+
+    snapshots = [item.model_dump() for item in request.items]
+    stored = await asyncio.gather(*(repository.get_financial_data(u) for u in request.user_ids))
+    missing = [u for u, financial_data in zip(request.user_ids, stored) if financial_data is None]
+    snapshots += [financial_data for financial_data in stored if financial_data is not None]
+
+    # Each method is evaluated for every snapshot in one pass, off the event loop
+    loop = asyncio.get_running_loop()
+    evaluations = {}
+    for m in method_ids:
+        evaluations[m] = await loop.run_in_executor(None, budgeting.evaluate_batch, m, snapshots)
+    return {
+        "results": [
+            {"user_id": snapshot["user_id"], "evaluations": {m: evaluations[m][i] for m in method_ids}}
+            for i, snapshot in enumerate(snapshots)
+        ],
+        "missing_user_ids": missing
+    }
+
+@app.post("/api/methods/{method_id}/evaluate")
+async def evaluate_method(method_id: str, data: FinancialData):
+    if method_id not in budgeting.METHODS:
+        raise HTTPException(status_code=404, detail="Method not found")
+    return budgeting.evaluate(method_id, data.model_dump())
+
 @app.get("/api/features")
 async def get_features():
     return features_db
@@ -113,31 +279,50 @@ async def get_feature(feature_id: str):
 
 @app.post("/api/financial-data", status_code=201)
 async def create_financial_data(data: FinancialData):
+    # Appended to the user's history; the repository sets seq and created_at
     data_id = str(uuid.uuid4())
-    financial_data_db[data.user_id] = {
+    return await repository.put_financial_data({
         "id": data_id,
         "user_id": data.user_id,
         "income": data.income,
         "expenses": data.expenses,
         "savings": data.savings,
-        "investments": data.investments,
-        "created_at": datetime.now().isoformat()
-    }
-    return financial_data_db[data.user_id]
+        "investments": data.investments
+    })
 
 @app.get("/api/financial-data/{user_id}")
-async def get_financial_data(user_id: str):
-    if user_id not in financial_data_db:
-        raise HTTPException(status_code=404, detail="Financial data not found")
-    return financial_data_db[user_id]
+async def get_financial_data(
+    user_id: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+):
+    # Without range or paging parameters: the latest snapshot
+    if start is None and end is None and cursor is None and limit is None:
+        financial_data = await repository.get_financial_data(user_id)
+        if financial_data is None:
+            raise HTTPException(status_code=404, detail="Financial data not found")
+        return financial_data
+
+    # Otherwise one page of snapshots with from <= created_at <= to, oldest
+    # first; pass next_cursor back as cursor for the next page
+    items, next_cursor = await repository.get_financial_history(
+        user_id,
+        start.timestamp() if start else None,
+        end.timestamp() if end else None,
+        cursor or 0,
+        limit or HISTORY_PAGE_SIZE,
+    )
+    return {"items": items, "next_cursor": next_cursor}
 
 @app.get("/api/dashboard/{user_id}")
 async def get_dashboard_data(user_id: str):
-    if user_id not in users_db:
+    user_data = await repository.get_user(user_id)
+    if user_data is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    financial_data = financial_data_db.get(user_id)
-    user_data = users_db[user_id]
+    financial_data = await repository.get_financial_data(user_id)
     
     dashboard_data = {
         "user": {
@@ -157,5 +342,27 @@ async def get_dashboard_data(user_id: str):
     return dashboard_data
 
 if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="FinPercent API server")
+    parser.add_argument("--host", default=os.environ.get("FINPERCENT_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("FINPERCENT_PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("FINPERCENT_WORKERS", "0")),
+                        help="Worker processes (default: CPU count; 1 with FINPERCENT_DB=memory)")
+    args = parser.parse_args()
+
+    shared_state = os.environ.get("FINPERCENT_DB") != "memory"
+    workers = args.workers or (os.cpu_count() or 1 if shared_state else 1)
+    if workers > 1 and not shared_state:
+        # Each worker would hold its own users, so logins would fail at random
+        sys.exit("FINPERCENT_DB=memory keeps state per process; run with --workers 1 or use SQLite")
+
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+
+    if workers == 1:
+        uvicorn.run(app, host=args.host, port=args.port)
+    else:
+        # Workers import the app themselves, so it is passed by name
+        uvicorn.run("server:app", host=args.host, port=args.port, workers=workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
\ No newline at end of file
@@ -122,6 +122,31 @@ class ComprehensiveAPITester:
             data={"username": username, "password": "wrongpassword"}
         )
         
+        # Test login with an unknown username
+        self.run_test(
+            "Login - Unknown User",
+            "POST",
+            "api/login",
+            401,
+            data={"username": f"nobody_{uuid.uuid4().hex[:8]}", "password": password}
+        )
+        
+        # Test duplicate usernames are rejected; emails need not be unique
+        self.run_test(
+            "Create User - Duplicate Username",
+            "POST",
+            "api/users",
+            409,
+            data={"username": username, "email": f"other_{email}", "password": password}
+        )
+        self.run_test(
+            "Create User - Shared Email",
+            "POST",
+            "api/users",
+            201,
+            data={"username": f"{username}_2", "email": email.upper(), "password": password}
+        )
+        
         return success
 
     def test_methods_endpoints(self):
@@ -265,7 +290,70 @@ class ComprehensiveAPITester:
             assert retrieved_data.get('user_id') == self.user_id, "Retrieved user ID mismatch"
             assert retrieved_data.get('income') == 75000.0, "Retrieved income mismatch"
             print(f"   Retrieved financial data successfully")
-        
+
+        # Test non-finite amounts are rejected (pydantic reads "NaN" as a float)
+        self.run_test(
+            "Create Financial Data - NaN Amount",
+            "POST",
+            "api/financial-data",
+            422,
+            data={**financial_data, "expenses": {**financial_data["expenses"], "food": "NaN"}}
+        )
+
+        # Test history: a second snapshot is appended, not overwritten
+        financial_data["income"] = 80000.0
+        financial_data["expenses"]["travel"] = 900.0
+        success, second_data = self.run_test(
+            "Append Financial Data Snapshot",
+            "POST",
+            "api/financial-data",
+            201,
+            data=financial_data
+        )
+
+        if success:
+            success, latest_data = self.run_test(
+                "Get Latest Financial Data",
+                "GET",
+                f"api/financial-data/{self.user_id}",
+                200
+            )
+            if success:
+                assert latest_data.get('income') == 80000.0, "Latest snapshot should be returned"
+                assert latest_data.get('expenses', {}).get('travel') == 900.0, "Latest expenses mismatch"
+
+        if success:
+            success, first_page = self.run_test(
+                "Get Financial History - First Page",
+                "GET",
+                f"api/financial-data/{self.user_id}?limit=1",
+                200
+            )
+            if success:
+                assert [item['income'] for item in first_page['items']] == [75000.0], "First page mismatch"
+                assert 'travel' not in first_page['items'][0]['expenses'], "Old snapshot gained a category"
+                assert first_page['next_cursor'] is not None, "Missing cursor for second page"
+                success, second_page = self.run_test(
+                    "Get Financial History - Next Page",
+                    "GET",
+                    f"api/financial-data/{self.user_id}?limit=1&cursor={first_page['next_cursor']}",
+                    200
+                )
+                if success:
+                    assert [item['income'] for item in second_page['items']] == [80000.0], "Second page mismatch"
+                    assert second_page['next_cursor'] is None, "History should end after two snapshots"
+
+        if success:
+            success, range_page = self.run_test(
+                "Get Financial History - Time Range",
+                "GET",
+                f"api/financial-data/{self.user_id}?from={second_data['created_at']}",
+                200
+            )
+            if success:
+                assert [item['id'] for item in range_page['items']] == [second_data['id']], "Range query mismatch"
+                print(f"   Financial history pages and time ranges work")
+
         # Test getting financial data for non-existent user
         fake_user_id = str(uuid.uuid4())
         self.run_test(
@@ -322,6 +410,88 @@ class ComprehensiveAPITester:
         
         return True
 
+    def test_method_evaluation(self):
+        """Test budgeting method evaluation, single and batch"""
+        financial_data = {
+            "user_id": self.user_id or str(uuid.uuid4()),
+            "income": 10000.0,
+            "expenses": {
+                "housing": 2500.0,
+                "food": 800.0,
+                "entertainment": 1500.0,
+                "education": 300.0,
+                "taxes": 2000.0
+            },
+            "savings": 1000.0,
+            "investments": {"stocks": 500.0}
+        }
+
+        expected_splits = {
+            "nws": {"Necessities": 50, "Wants": 30, "Savings": 20},
+            "kakeibo": {"Needs": 50, "Wants": 20, "Culture": 20, "Unexpected": 10},
+            "stop": {"Savings": 25, "Taxes": 30, "Operations": 35, "Profit": 10}
+        }
+        all_passed = True
+        for method_id, split in expected_splits.items():
+            success, evaluation = self.run_test(
+                f"Evaluate Method - {method_id}",
+                "POST",
+                f"api/methods/{method_id}/evaluate",
+                200,
+                data=financial_data
+            )
+            all_passed = all_passed and success
+            if success:
+                allocation = {bucket['name']: bucket for bucket in evaluation['allocation']}
+                assert {name: b['percentage'] for name, b in allocation.items()} == split, f"{method_id} split mismatch"
+                for name, bucket in allocation.items():
+                    assert bucket['target'] == 10000.0 * split[name] / 100, f"{method_id} {name} target mismatch"
+                    assert bucket['variance'] == round(bucket['actual'] - bucket['target'], 2), f"{method_id} {name} variance mismatch"
+                assert evaluation['recommendations'], f"{method_id} has no recommendations"
+
+        # NWS: necessities 5300 (housing, food, taxes), wants 1800, savings 1500 (savings + investments)
+        if all_passed:
+            _, nws = self.run_test("Evaluate Method - NWS Actuals", "POST", "api/methods/nws/evaluate", 200,
+                                   data=financial_data)
+            actuals = {bucket['name']: bucket['actual'] for bucket in nws['allocation']}
+            assert actuals == {"Necessities": 5300.0, "Wants": 1800.0, "Savings": 1500.0}, f"NWS actuals: {actuals}"
+            print(f"   Method allocations and variances are consistent")
+
+        self.run_test(
+            "Evaluate Method - Non-existent",
+            "POST",
+            "api/methods/nonexistent/evaluate",
+            404,
+            data=financial_data
+        )
+
+        # Batch: an inline snapshot plus the stored snapshot of this user
+        batch = {"items": [financial_data], "user_ids": [self.user_id, str(uuid.uuid4())]}
+        success, batch_result = self.run_test(
+            "Evaluate Methods - Batch",
+            "POST",
+            "api/methods/evaluate",
+            200,
+            data=batch
+        )
+        if success:
+            assert len(batch_result['results']) == 2, "Batch should evaluate the inline and stored snapshots"
+            assert len(batch_result['missing_user_ids']) == 1, "Unknown user should be reported missing"
+            for result in batch_result['results']:
+                assert set(result['evaluations']) == set(expected_splits), "Batch should run every method"
+            print(f"   Batch evaluated {len(batch_result['results'])} snapshots with every method")
+        all_passed = all_passed and success
+
+        self.run_test(
+            "Evaluate Methods - Batch Unknown Method",
+            "POST",
+            "api/methods/evaluate",
+            404,
+            data={"items": [financial_data], "methods": ["nonexistent"]}
+        )
+
+        return all_passed
+
     def run_comprehensive_tests(self):
         """Run all comprehensive tests"""
         print("🚀 Starting Comprehensive Backend API Testing...")
@@ -348,6 +518,10 @@ class ComprehensiveAPITester:
         # Test financial data flow
         if not self.test_financial_data_flow():
             print("❌ Financial data flow failed")
+
+        # Test budgeting method evaluation
+        if not self.test_method_evaluation():
+            print("❌ Method evaluation failed")
             
         # Test dashboard endpoint
         if not self.test_dashboard_endpoint():
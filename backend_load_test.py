@@ -0,0 +1,109 @@
+import requests
+import uuid
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+class LoadTester:
+    """Login -> dashboard round trips from many clients at once.
+
+    Against a multi-worker server (python3 backend/server.py --workers N),
+    consecutive requests of one client land on different workers, so every
+    dashboard must still show the user that just logged in.
+    """
+
+    def __init__(self, base_url="http://localhost:8001", users=8, rounds=25, concurrency=16):
+        self.base_url = base_url
+        self.users = users
+        self.rounds = rounds
+        self.concurrency = concurrency
+        self.latencies = {"login": [], "dashboard": []}
+        self.errors = []
+        self.workers = set()
+        self.cross_worker = 0
+
+    def request(self, kind, method, endpoint, data=None):
+        url = f"{self.base_url}/{endpoint}"
+        start = time.perf_counter()
+        if method == 'GET':
+            response = requests.get(url, headers={'Content-Type': 'application/json'})
+        else:
+            response = requests.post(url, json=data, headers={'Content-Type': 'application/json'})
+        self.latencies[kind].append(time.perf_counter() - start)
+        worker = response.headers.get("x-worker-pid")
+        if worker:
+            self.workers.add(worker)
+        return response, worker
+
+    def create_user(self, _):
+        username = f"load_user_{uuid.uuid4().hex[:8]}"
+        password = "LoadPassword123!"
+        response = requests.post(f"{self.base_url}/api/users", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": password
+        }, headers={'Content-Type': 'application/json'})
+        if response.status_code != 201:
+            raise RuntimeError(f"Creating {username} failed: {response.status_code} {response.text}")
+        return response.json()["id"], username, password
+
+    def login_then_dashboard(self, user):
+        user_id, username, password = user
+        login, login_worker = self.request("login", "POST", "api/login",
+                                           {"username": username, "password": password})
+        if login.status_code != 200 or login.json().get("user_id") != user_id:
+            self.errors.append(f"login {username}: {login.status_code} {login.text}")
+            return
+        dashboard, dashboard_worker = self.request("dashboard", "GET", f"api/dashboard/{user_id}")
+        if dashboard.status_code != 200:
+            self.errors.append(f"dashboard {username}: {dashboard.status_code} {dashboard.text}")
+            return
+        shown = dashboard.json()["user"]
+        if shown["id"] != user_id or shown["username"] != username:
+            self.errors.append(f"dashboard {username}: shows {shown['username']} ({shown['id']})")
+        if login_worker and dashboard_worker and login_worker != dashboard_worker:
+            self.cross_worker += 1
+
+    def run(self):
+        print(f"🚀 Load test against {self.base_url}")
+        print(f"   {self.users} users x {self.rounds} rounds, {self.concurrency} concurrent clients")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            users = list(pool.map(self.create_user, range(self.users)))
+            start = time.perf_counter()
+            list(pool.map(self.login_then_dashboard, users * self.rounds))
+            elapsed = time.perf_counter() - start
+
+        total = self.users * self.rounds
+        print(f"\n📊 {total} login -> dashboard round trips in {elapsed:.2f}s ({total / elapsed:.1f}/s)")
+        for kind, seconds in self.latencies.items():
+            values = sorted(s * 1000 for s in seconds)
+            if not values:
+                continue
+            p50, p95, p99 = (values[min(len(values) - 1, int(len(values) * pct / 100))] for pct in (50, 95, 99))
+            print(f"   {kind:<10} p50 {p50:7.1f}ms   p95 {p95:7.1f}ms   p99 {p99:7.1f}ms")
+        print(f"   Workers seen: {len(self.workers) or 'unknown'}, "
+              f"round trips served by two workers: {self.cross_worker}")
+
+        if self.errors:
+            print(f"\n❌ {len(self.errors)} failed or inconsistent round trips:")
+            for error in self.errors[:10]:
+                print(f"   - {error}")
+            return False
+        print("\n✅ Every dashboard matched the user that logged in")
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description="FinPercent login/dashboard load test")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=25)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    tester = LoadTester(args.base_url, args.users, args.rounds, args.concurrency)
+    return 0 if tester.run() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())